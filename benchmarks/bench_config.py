@@ -0,0 +1,90 @@
+"""
+Building chart configs in Python: utils.clean_dict/config/dataset,
+Chart_init.add_dataset/setup, the *_chart helpers on DataFrames,
+time_series.data_format and scatter point building.
+
+Widgets are stubbed, so only the Python side (grouping, list conversion,
+config assembly) is measured.
+
+$ python benchmarks/bench_config.py
+"""
+
+import numpy as np
+import pandas as pd
+from bench_support import stub_chart, stubbed_widgets, timed, result, print_results
+from chart_ipynb import utils, chart_setup, time_series, scatter
+from chart_ipynb import bar, line, pie, doughnut, radar, polarArea, bubble
+
+# categories of the label column for the aggregating helpers.
+categories = 50
+
+def frame(n):
+    random = np.random.RandomState(0)
+    return pd.DataFrame({
+        "label": pd.Series(random.randint(0, categories, n)).map(lambda i: "c%02d" % i),
+        "value": random.rand(n),
+        "x": random.rand(n),
+        "y": random.rand(n),
+        "r": random.rand(n) * 10,
+    })
+
+def dated_frame(n):
+    dates = pd.date_range("1990-01-01", periods=n, freq="min")
+    return pd.DataFrame({"Date": dates[::-1], "Close": np.random.RandomState(1).rand(n)})
+
+def build_dicts(n):
+    values = np.random.RandomState(2).rand(n)
+    dataset = utils.dataset(label="values", data=values, backgroundColor="red", fill=False)
+    config = utils.config(type="line", data=utils.data(labels=np.arange(n), datasets=[dataset]))
+    return utils.clean_dict(config=config)
+
+def add_dataset_setup(n):
+    chart = stub_chart(chart_setup.Chart_init)
+    labels = list(range(n))
+    for name in ("a", "b", "c"):
+        chart.add_dataset(labels, np.random.RandomState(3).rand(n), name)
+    chart.setup()
+    return chart
+
+helpers = [
+    ("bar_chart", lambda df: bar.bar_chart("bench", df, "label", "value")),
+    ("line_chart", lambda df: line.line_chart("bench", df, "label", "value")),
+    ("pie_chart", lambda df: pie.pie_chart("bench", df, "label", "value")),
+    ("doughnut_chart", lambda df: doughnut.doughnut_chart("bench", df, "label", "value")),
+    ("radar_chart", lambda df: radar.radar_chart("bench", df, "label", "value")),
+    ("polarArea_chart", lambda df: polarArea.polarArea_chart("bench", df, "label", "value")),
+    ("bar_chart_multi_agg", lambda df: bar.bar_chart(
+        "bench", df, "label", ["value", "x", "y"], agg=["sum", "mean", "max", "q90"])),
+    ("scatter_chart", lambda df: scatter.scatter_chart("bench", df, "x", "y")),
+    ("bubble_chart", lambda df: bubble.bubble_chart("bench", df, "x", "y", "r")),
+]
+
+def run(sizes=(10**3, 10**4, 10**5)):
+    results = []
+    for n in sizes:
+        (seconds, _) = timed(build_dicts, n)
+        results.append(result("utils_config_dataset", n, seconds))
+        (seconds, _) = timed(add_dataset_setup, n)
+        results.append(result("add_dataset_setup", n, seconds))
+        df = frame(n)
+        with stubbed_widgets():
+            for (name, helper) in helpers:
+                (seconds, _) = timed(helper, df)
+                results.append(result(name, n, seconds))
+        dated = dated_frame(n)
+        (seconds, (values, labels)) = timed(time_series.data_format, dated, "Close")
+        assert len(labels) == n
+        results.append(result("data_format", n, seconds))
+        (seconds, points) = timed(scatter.point_data, df["x"].values, df["y"].values)
+        results.append(result("scatter_point_data", n, seconds))
+        # the point dicts (json transport) or typed columns are built only when sent.
+        (seconds, _) = timed(utils.json_safe, points)
+        results.append(result("scatter_points_json", n, seconds))
+        (seconds, _) = timed(utils.pack_data, points)
+        results.append(result("scatter_points_packed", n, seconds))
+        (seconds, _) = timed(lambda: [dict(x=x, y=y) for (x, y) in zip(df["x"].tolist(), df["y"].tolist())])
+        results.append(result("scatter_point_dicts", n, seconds))
+    return results
+
+if __name__ == "__main__":
+    print_results(run())
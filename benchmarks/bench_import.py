@@ -0,0 +1,48 @@
+"""
+Import time of the chart_ipynb modules, measured with python -X importtime
+in a fresh interpreter per module.
+
+jp_proxy_widget (with IPython and ipywidgets) and numpy are imported first:
+every chart needs them, so the measurement is what chart_ipynb itself adds.
+pandas alone costs several times the budget, so a module that imports it (or
+pandas_datareader, PIL) eagerly again goes over.
+
+$ python benchmarks/bench_import.py     # exits with status 1 when over budget
+"""
+
+import os
+import subprocess
+import sys
+from bench_support import result, print_results
+
+here = os.path.dirname(os.path.abspath(__file__))
+
+# seconds chart_ipynb.<module> may add on top of jp_proxy_widget and numpy.
+budget = 0.15
+
+module_names = ("bar", "line", "pie", "doughnut", "radar", "polarArea", "scatter", "bubble", "time_series")
+
+preloaded = "import jp_proxy_widget, numpy"
+
+def import_seconds(module):
+    "Cumulative -X importtime seconds of importing module after the preloaded modules."
+    command = [sys.executable, "-X", "importtime", "-c", "%s; import %s" % (preloaded, module)]
+    process = subprocess.run(command, cwd=os.path.dirname(here), capture_output=True, text=True, check=True)
+    for line in process.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1e6
+    raise ValueError("no importtime entry for %s" % module)
+
+def run(repeats=3):
+    results = []
+    for name in module_names:
+        module = "chart_ipynb." + name
+        seconds = min(import_seconds(module) for _ in range(repeats))
+        results.append(result("import_" + name, 1, seconds, budget=budget, over_budget=seconds > budget))
+    return results
+
+if __name__ == "__main__":
+    results = run()
+    print_results(results)
+    raise SystemExit(1 if any(r["over_budget"] for r in results) else 0)
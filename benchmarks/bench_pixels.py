@@ -0,0 +1,49 @@
+"""
+Decoding canvas pixels fetched by ChartSuperClass.pixels_array.
+
+Compares the old path (hex string -> bytearray -> np.array copy) with
+decode_pixels on hex and base64 payloads (decoded bytes wrapped by
+np.frombuffer), and reports the payload sizes sent over the comm.
+vs_hex_path is the time relative to the old path (pixels_hex).
+
+The default hex payload decodes with binascii.unhexlify, a little faster
+than the old path.  base64 (pixel_encoding = "base64") is a third smaller
+but decodes 3-5x slower in Python; it is opt-in, for when the comm rather
+than the kernel is the bottleneck.
+
+$ python benchmarks/bench_pixels.py
+"""
+
+import base64
+import numpy as np
+from jp_proxy_widget.hex_codec import hex_to_bytearray, bytearray_to_hex
+from bench_support import timed, result, print_results
+from chart_ipynb import chart_framework
+
+def hex_path(payload):
+    data_bytes = hex_to_bytearray(payload["data"])
+    array1d = np.array(data_bytes, dtype=np.ubyte)
+    return array1d.reshape((payload["height"], payload["width"], 4))
+
+def run(sizes=((800, 600), (1600, 1200), (3200, 2400))):
+    results = []
+    for (width, height) in sizes:
+        pixels = np.random.RandomState(0).randint(0, 256, width * height * 4).astype(np.ubyte)
+        hex_payload = dict(data=bytearray_to_hex(pixels.tobytes()), width=width, height=height)
+        b64_payload = dict(data=base64.b64encode(pixels.tobytes()).decode("ascii"),
+                           encoding="base64", width=width, height=height)
+        size = "%sx%s" % (width, height)
+        (baseline, old) = timed(hex_path, hex_payload)
+        results.append(result("pixels_hex", size, baseline, payload_bytes=len(hex_payload["data"])))
+        (seconds, new) = timed(chart_framework.decode_pixels, hex_payload)
+        results.append(result("pixels_hex_frombuffer", size, seconds, payload_bytes=len(hex_payload["data"]),
+                              vs_hex_path=round(seconds / baseline, 2)))
+        assert np.array_equal(old, new)
+        (seconds, new) = timed(chart_framework.decode_pixels, b64_payload)
+        results.append(result("pixels_base64_frombuffer", size, seconds, payload_bytes=len(b64_payload["data"]),
+                              vs_hex_path=round(seconds / baseline, 2)))
+        assert np.array_equal(old, new)
+    return results
+
+if __name__ == "__main__":
+    print_results(run())
@@ -0,0 +1,50 @@
+"""
+Serializing large chart configs to JSON (ChartSuperClass.config_json / html_script).
+
+Compares the stdlib json.dumps path (which needs the config already converted
+to lists and writes NaN as the invalid token NaN) with utils.dumps on list and
+numpy configs, and times utils.json_safe alone (the conversion applied before
+a config is sent to the widget).
+
+$ python benchmarks/bench_serialize.py
+"""
+
+import json
+import numpy as np
+from bench_support import timed, result, print_results
+from chart_ipynb import utils
+
+def line_config(y, labels):
+    return utils.config(
+        type="line",
+        data=utils.data(labels=labels, datasets=[utils.dataset(label="y", data=y)]),
+    )
+
+def scatter_config(points):
+    return utils.config(type="scatter", data=utils.data(datasets=[utils.dataset(label="xy", data=points)]))
+
+def run(sizes=(10**5, 10**6)):
+    results = []
+    for n in sizes:
+        random = np.random.RandomState(0)
+        y = random.rand(n)
+        y[::1000] = np.nan
+        labels = np.arange(n)
+        configs = [
+            ("line_lists", line_config(y.tolist(), labels.tolist())),
+            ("line_numpy", line_config(y, labels)),
+            ("scatter_dicts", scatter_config([dict(x=float(i), y=float(v)) for (i, v) in enumerate(y)])),
+        ]
+        for (name, config) in configs:
+            if name != "line_numpy":
+                (seconds, text) = timed(json.dumps, config)
+                results.append(result("json.dumps_" + name, n, seconds, json_bytes=len(text)))
+            (seconds, text) = timed(utils.dumps, config)
+            results.append(result("utils.dumps_" + name, n, seconds, json_bytes=len(text)))
+            (seconds, safe) = timed(utils.json_safe, config)
+            results.append(result("utils.json_safe_" + name, n, seconds))
+            assert json.loads(text) == json.loads(json.dumps(safe))
+    return results
+
+if __name__ == "__main__":
+    print_results(run())
@@ -0,0 +1,40 @@
+"""
+Shared helpers for the chart_ipynb benchmarks.
+
+The benchmarks run without a browser: widgets are created with
+load_requirements patched out and js_init replaced by a no-op.
+"""
+
+import contextlib
+import time
+from unittest.mock import patch
+
+def stub_chart(chart_class, *pargs, **kwargs):
+    "Create a chart widget that never sends anything to Javascript."
+    with patch("chart_ipynb.chart_framework.load_requirements"):
+        chart = chart_class(*pargs, **kwargs)
+    chart.js_init = lambda *args, **other_arguments: None
+    return chart
+
+@contextlib.contextmanager
+def stubbed_widgets():
+    "Within the block every chart widget (e.g. those made by the *_chart helpers) is stubbed."
+    from chart_ipynb import chart_framework
+    with patch("chart_ipynb.chart_framework.load_requirements"), \
+            patch.object(chart_framework.ChartSuperClass, "js_init", lambda *args, **other_arguments: None):
+        yield
+
+def timed(function, *args, **kwargs):
+    "Return (seconds, result) for one call."
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return (time.perf_counter() - start, result)
+
+def result(name, size, seconds, **other):
+    "One benchmark measurement."
+    return dict(name=name, size=size, seconds=seconds, **other)
+
+def print_results(results):
+    for r in results:
+        extra = ", ".join("%s=%s" % (k, r[k]) for k in r if k not in ("name", "size", "seconds"))
+        print("%-32s size=%-10s %10.4fs  %s" % (r["name"], r["size"], r["seconds"], extra))
@@ -0,0 +1,40 @@
+"""
+Streaming appends through Chart_init.update_data.
+
+Label and dataset name lookups are hashed, so the cost per appended point
+should stay flat as the chart grows (linear total cost).
+
+$ python benchmarks/bench_update_data.py
+"""
+
+from bench_support import stub_chart, timed, result, print_results
+from chart_ipynb import chart_setup
+
+def append_labels(n):
+    chart = stub_chart(chart_setup.Chart_init)
+    chart.add_dataset([], [], "stream")
+    for i in range(n):
+        chart.update_data(i, "label %s" % i)
+    return chart
+
+def run(sizes=(10000, 30000, 100000)):
+    results = []
+    for n in sizes:
+        (seconds, chart) = timed(append_labels, n)
+        assert len(chart.labels) == n
+        results.append(result("update_data_append", n, seconds, us_per_point=round(1e6 * seconds / n, 3)))
+    return results
+
+def check_linear(results, tolerance=3.0):
+    "The per point cost of the largest run may not exceed tolerance times that of the smallest."
+    first = results[0]["seconds"] / results[0]["size"]
+    last = results[-1]["seconds"] / results[-1]["size"]
+    return last / first <= tolerance
+
+if __name__ == "__main__":
+    results = run()
+    print_results(results)
+    linear = check_linear(results)
+    print("scales linearly: %s" % linear)
+    if not linear:
+        raise SystemExit(1)
@@ -0,0 +1,126 @@
+"""
+Run the benchmark modules and store the results as JSON, or compare two result files.
+
+$ python benchmarks/run_benchmarks.py                     # default sizes
+$ python benchmarks/run_benchmarks.py --sizes 1e3,1e5,1e7 --only config
+$ python benchmarks/run_benchmarks.py --compare old.json new.json
+
+Results go to benchmarks/results/<commit>.json unless --output is given.
+--compare exits with status 1 when a measurement is slower than --threshold
+times its baseline.
+"""
+
+import argparse
+import datetime
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, here)
+sys.path.insert(0, os.path.dirname(here))
+
+# benchmark module -> whether run() takes point counts as sizes.
+modules = {
+    "bench_config": True,
+    "bench_serialize": True,
+    "bench_update_data": True,
+    "bench_pixels": False,
+    "bench_import": False,
+}
+
+def commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=here, stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def run(only=None, sizes=None):
+    "Run the selected benchmark modules; return the result document."
+    results = []
+    for name in modules:
+        if only and not any(selected in name for selected in only):
+            continue
+        module = importlib.import_module(name)
+        if sizes and modules[name]:
+            measurements = module.run(sizes=sizes)
+        else:
+            measurements = module.run()
+        for measurement in measurements:
+            results.append(dict(measurement, module=name))
+    return dict(
+        commit=commit(),
+        timestamp=datetime.datetime.now().isoformat(timespec="seconds"),
+        python=platform.python_version(),
+        platform=platform.platform(),
+        results=results,
+    )
+
+def key(measurement):
+    return (measurement.get("module"), measurement["name"], str(measurement["size"]))
+
+def compare(baseline, current, threshold=1.5):
+    "Rows of (name, size, baseline seconds, current seconds, ratio, regressed) for shared measurements."
+    before = {key(m): m for m in baseline["results"]}
+    rows = []
+    for measurement in current["results"]:
+        old = before.get(key(measurement))
+        if old is None:
+            continue
+        ratio = measurement["seconds"] / old["seconds"] if old["seconds"] else float("inf")
+        rows.append((measurement["name"], measurement["size"], old["seconds"], measurement["seconds"],
+                     ratio, ratio > threshold))
+    return rows
+
+def print_comparison(rows, baseline, current):
+    print("baseline %s -> current %s" % (baseline.get("commit"), current.get("commit")))
+    for (name, size, old, new, ratio, regressed) in rows:
+        print("%-32s size=%-10s %10.4fs %10.4fs  x%.2f%s" % (
+            name, size, old, new, ratio, "  REGRESSION" if regressed else ""))
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+def parse_sizes(text):
+    return tuple(int(float(size)) for size in text.split(","))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", help="comma separated benchmark module names (substrings)")
+    parser.add_argument("--sizes", type=parse_sizes, help="comma separated point counts, e.g. 1e3,1e5,1e7")
+    parser.add_argument("--output", help="where to write the JSON results")
+    parser.add_argument("--compare", nargs="+", metavar="RESULTS",
+                        help="baseline JSON, and optionally the current JSON (otherwise run now)")
+    parser.add_argument("--threshold", type=float, default=1.5,
+                        help="slowdown ratio reported as a regression (default 1.5)")
+    args = parser.parse_args(argv)
+    only = args.only.split(",") if args.only else None
+    if args.compare and len(args.compare) > 1:
+        current = load(args.compare[1])
+    else:
+        current = run(only, args.sizes)
+        output = args.output
+        if output is None:
+            output = os.path.join(here, "results", current["commit"] + ".json")
+        directory = os.path.dirname(os.path.abspath(output))
+        os.makedirs(directory, exist_ok=True)
+        with open(output, "w") as f:
+            json.dump(current, f, indent=1)
+        print("wrote %s" % output)
+    if not args.compare:
+        from bench_support import print_results
+        print_results(current["results"])
+        return 0
+    baseline = load(args.compare[0])
+    rows = compare(baseline, current, args.threshold)
+    print_comparison(rows, baseline, current)
+    return 1 if any(row[-1] for row in rows) else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,83 @@
+"""
+Group by aggregation shared by the DataFrame chart helpers (bar_chart, line_chart, ...).
+"""
+
+import re
+from . import utils
+
+named_aggregations = ("sum", "mean", "count", "min", "max", "median", "std", "var", "first", "last")
+
+def parse_agg(agg):
+    """
+    (name, how) for one aggregation: how is a pandas aggregation name or a quantile in [0, 1].
+    agg: one of named_aggregations, a quantile as 'q90' / 'p90' or a float like 0.9 (None: 'sum').
+    """
+    if agg is None:
+        return ("sum", "sum")
+    if isinstance(agg, float):
+        if 0 <= agg <= 1:
+            return ("q%g" % (agg * 100), agg)
+    elif isinstance(agg, str):
+        if agg in named_aggregations:
+            return (agg, agg)
+        match = re.match(r"^[qp](\d+(\.\d+)?)$", agg)
+        if match and float(match.group(1)) <= 100:
+            return (agg, float(match.group(1)) / 100.0)
+    print("agg should be one of %s, a quantile like 'q90' or 0.9, or a list of these" % (named_aggregations,))
+    raise ValueError(agg)
+
+def aggregate(data, label, value, agg=None, sort=True):
+    """
+    Group data by the label column and aggregate the value column(s) in one groupby.
+    value: a column name or a list of column names
+    agg: an aggregation (see parse_agg) or a list of them; default 'sum'
+    sort: sort the labels; False keeps the order of first appearance, which is faster
+    Return (labels, series): series holds one (dataset name, values) pair per value column
+    and aggregation.  One column with one aggregation keeps the name 'dataset1'; otherwise
+    datasets are named by the column (and the aggregation when there are several).
+    """
+    columns = list(value) if isinstance(value, (list, tuple)) else [value]
+    aggs = list(agg) if isinstance(agg, (list, tuple)) else [agg]
+    how = [parse_agg(a) for a in aggs]
+    grouped = data[[label] + columns].groupby(label, observed=True, sort=sort)[columns]
+    names = []
+    for (name, function) in how:
+        if isinstance(function, str) and function not in names:
+            names.append(function)
+    results = {}
+    index = None
+    if names:
+        table = grouped.agg(names)
+        index = table.index
+        for column in columns:
+            for name in names:
+                results[(column, name)] = table[(column, name)]
+    for (name, function) in how:
+        if not isinstance(function, str):
+            table = grouped.quantile(function)
+            if index is None:
+                index = table.index
+            for column in columns:
+                results[(column, name)] = table[column]
+    labels = index.tolist()
+    series = []
+    for column in columns:
+        for (name, function) in how:
+            values = results[(column, name)].reindex(index)
+            if len(how) > 1:
+                dataset_name = "%s (%s)" % (column, name)
+            elif len(columns) > 1:
+                dataset_name = column
+            else:
+                dataset_name = "dataset1"
+            series.append((dataset_name, values.tolist()))
+    return labels, series
+
+def frame_datasets(data, label, value, agg=None, sort=True):
+    """
+    (labels, series) for a chart helper: aggregated when label and value columns are given,
+    otherwise the label and value passed through as one 'dataset1'.
+    """
+    if utils.is_dataframe(data) and (label is not None) and (value is not None):
+        return aggregate(data, label, value, agg=agg, sort=sort)
+    return label, [('dataset1', value)]
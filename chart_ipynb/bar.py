@@ -1,7 +1,8 @@
 from . import chart_framework
 from . import chart_setup
 from . import utils
-import pandas as pd
+from . import aggregation
+from . import lazy
 import numpy as np
 
 
@@ -24,21 +25,26 @@ class Bar(chart_setup.Chart_init):
         self.options = options
         self.reset()
 
-def bar_chart(title, data, label=None, value=None, agg=None):
+@lazy.deferrable
+def bar_chart(title, data, label=None, value=None, agg=None, decimate=False, sort=True):
     '''
     data format: pd.DataFrame 
                  or
                  {'label1': 1, 'label2': 2}
                  or
                  {'label':[], 'dataset1':[],...}
+    agg: how values are aggregated per label: 'sum' (default), 'mean', 'count', 'min', 'max',
+         a quantile like 'q90', or a list of these (one dataset each)
+    value: a column name, or a list of columns for one dataset per column
+    sort: sort the labels (False keeps their first appearance order)
+    decimate: if True, keep only the min and max of each pixel wide bucket of bars
+    lazy: if True, return a lazy.ChartSpec that builds the chart on display or render()
     '''
     chart = Bar(title=title)
-    if isinstance(data, pd.DataFrame):
-        if (label is not None) & (value is not None):
-            data = data[[label,value]].groupby(label).sum().reset_index()
-            label = data[label].tolist()
-            value = data[value].tolist()
-        chart.add_dataset(label,value,'dataset1')
+    if utils.is_dataframe(data):
+        label, series = aggregation.frame_datasets(data, label, value, agg=agg, sort=sort)
+        for (name, values) in series:
+            chart.add_dataset(label, values, name)
     if isinstance(data, dict):
         if 'label' in data:
             label = data['label']
@@ -49,6 +55,8 @@ def bar_chart(title, data, label=None, value=None, agg=None):
             label = list(data.keys())
             value = list(data.values())
             chart.add_dataset(label,value,'dataset1')
+    if decimate:
+        chart.decimate()
     chart.setup()
     return chart
 
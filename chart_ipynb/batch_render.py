@@ -0,0 +1,77 @@
+"""
+Render many charts to PNG files outside a live notebook, using a pool of
+headless browser pages driven by puppeteer (see js/batch_render.js).
+
+Needs node and the puppeteer package, for example the one installed by
+`npm install` in end_to_end_tests (used by default when present).
+"""
+
+import json
+import os
+import subprocess
+import tempfile
+
+from . import local_files
+from . import utils
+
+renderer_script = local_files.vendor_path("js/batch_render.js")
+
+# puppeteer launch options, as in end_to_end_tests/jest-puppeteer.config.js
+launch_options = dict(headless=True, args=["--no-sandbox"])
+
+def default_node_path():
+    "node_modules of the end to end tests, if they have been installed."
+    package_dir = os.path.dirname(local_files.my_dir)
+    node_modules = os.path.join(package_dir, "end_to_end_tests", "node_modules")
+    if os.path.isdir(node_modules):
+        return node_modules
+    return None
+
+def chart_config(chart):
+    "Plain config of a chart (anything with a .config, e.g. Chart_init) or a config dict."
+    config = getattr(chart, "config", chart)
+    if config is None:
+        print('the chart has no config: call setup() first')
+        raise ValueError
+    return utils.json_safe(utils.unpack_config(config))
+
+def render_charts(charts, out_dir, width=800, height=400, pool_size=4,
+                  prefix="chart", node="node", node_path=None, timeout=None):
+    '''
+    charts: chart objects or config dicts (Chart_init.config, *_chart helper results)
+    out_dir: directory for the PNG files, named prefix_0000.png, prefix_0001.png, ...
+    pool_size: number of browser pages rendering concurrently
+    Returns the renderer report: {'paths', 'count', 'pool_size', 'seconds', 'charts_per_second'}
+    '''
+    if not os.path.isdir(out_dir):
+        os.makedirs(out_dir)
+    job = dict(
+        chart_js=local_files.vendor_path("js/Chart.js"),
+        launch=launch_options,
+        width=width,
+        height=height,
+        pool_size=pool_size,
+        charts=[
+            dict(config=chart_config(chart),
+                 path=os.path.abspath(os.path.join(out_dir, "%s_%04d.png" % (prefix, i))))
+            for (i, chart) in enumerate(charts)
+        ],
+    )
+    (descriptor, job_path) = tempfile.mkstemp(suffix=".json")
+    try:
+        with os.fdopen(descriptor, "w") as f:
+            json.dump(job, f)
+        env = dict(os.environ)
+        if node_path is None:
+            node_path = default_node_path()
+        if node_path is not None:
+            env["NODE_PATH"] = node_path
+        completed = subprocess.run(
+            [node, renderer_script, job_path],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            universal_newlines=True, env=env, timeout=timeout)
+    finally:
+        os.remove(job_path)
+    if completed.returncode != 0:
+        raise RuntimeError("batch renderer failed: " + completed.stderr)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
@@ -2,7 +2,7 @@ from . import chart_framework
 from . import chart_setup
 from . import scatter
 from . import utils
-import pandas as pd
+from . import lazy
 import numpy as np
 
 
@@ -18,41 +18,32 @@ class Bubble(scatter.Scatter):
         self.options = options
         self.reset()
 
-def bubble_chart(title, data, x=None, y=None):
+@lazy.deferrable
+def bubble_chart(title, data, x=None, y=None, r=None, spatial_index=False):
     '''
     data format: pd.DataFrame 
                  or
-                 [{'x': x,'y': y},{'x': x,'y': y},...]
+                 [{'x': x,'y': y, 'r': r},{'x': x,'y': y, 'r': r},...]
                  or
-                 {'x': [1,2,3], 'y': [2,4,6]}
+                 {'x': [1,2,3], 'y': [2,4,6], 'r': [5,10,15]}
                  or 
-                 {'dataset1':[{'x':1,'y':2},...],
+                 {'dataset1':[{'x':1,'y':2,'r':5},...],
                   'dataset2':.....}
+    r: the bubble radius column for a pd.DataFrame (optional)
+    spatial_index: use a grid index for clicks and tooltips (for many points)
+    lazy: if True, return a lazy.ChartSpec that builds the chart on display or render()
     '''
-    chart = Bubble(title=title)
-    if isinstance(data, pd.DataFrame):
-        if x is not None:
-            x = data[x].tolist()
-        if y is not None:
-            y = data[y].tolist()
-        dataset = []
-        for i in range(len(x)):
-            d = {'x':x[i],'y':y[i]}
-            dataset.append(d)
-        chart.add_dataset(dataset,'dataset1')
+    chart = Bubble(title=title, spatial_index=spatial_index)
+    if utils.is_dataframe(data):
+        radius = data[r].values if r is not None else None
+        chart.add_dataset(scatter.point_data(data[x].values, data[y].values, radius), 'dataset1')
     if isinstance(data, dict):
         if 'x' in data:
-            x = data['x']
-            y = data['y']
-            dataset = []
-            for i in range(len(x)):
-                d = {'x':x[i],'y':y[i]}
-                dataset.append(d)
-            chart.add_dataset(dataset,'dataset1')
+            chart.add_dataset(scatter.point_data(data['x'], data['y'], data.get('r')), 'dataset1')
         else:
             for name in data:
                 chart.add_dataset(data[name], name)
     if isinstance(data,list):
         chart.add_dataset(data, 'dataset1')
     chart.setup()
-    return chart
\ No newline at end of file
+    return chart
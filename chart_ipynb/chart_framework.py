@@ -7,6 +7,10 @@ as jupyter widgets.
 
 from . import local_files
 from . import utils
+from . import instrumentation
+import asyncio
+import collections
+import time
 import jp_proxy_widget
 from IPython.display import display
 
@@ -14,40 +18,321 @@ required_javascript_modules = [
     local_files.vendor_path("js/Chart.js"),
 ]
 
-def load_requirements(widget=None, silent=True, additional=()):
+# Page level bookkeeping for the Chart.js library: how many widgets asked for it,
+# how many times the library text was actually sent, and how many sends were skipped
+# because the page already had (or was already loading) Chart.js.
+loader_counters = dict(requested=0, sent=0, skipped=0)
+
+def loader_statistics():
+    "Return a copy of the Chart.js loading counters."
+    return dict(loader_counters)
+
+# Limits for the *_async captures: at most `concurrency` browser round trips in
+# flight at once (across all charts), each failing with asyncio.TimeoutError after
+# `timeout` seconds.
+capture_limits = dict(concurrency=8, timeout=30.0)
+_capture_semaphore = {}
+_pump_lock = {}
+
+def set_capture_limits(concurrency=None, timeout=None):
+    "Change the concurrency limit and/or the timeout (seconds, None for no timeout) of async captures."
+    if concurrency is not None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1: " + repr(concurrency))
+        capture_limits["concurrency"] = concurrency
+        _capture_semaphore.clear()
+    if timeout is not None:
+        capture_limits["timeout"] = timeout
+    return dict(capture_limits)
+
+def capture_semaphore():
+    "The semaphore bounding in flight captures for the running event loop."
+    loop = asyncio.get_event_loop()
+    semaphore = _capture_semaphore.get(loop)
+    if semaphore is None:
+        _capture_semaphore.clear()
+        semaphore = _capture_semaphore[loop] = asyncio.Semaphore(capture_limits["concurrency"])
+    return semaphore
+
+def in_kernel():
+    "True when running in an IPython kernel (where comm messages need pumping, see wait_for_browser)."
+    try:
+        from IPython import get_ipython
+    except ImportError:
+        return False
+    shell = get_ipython()
+    return getattr(shell, "kernel", None) is not None
+
+async def wait_for_browser(result, timeout, poll_interval=0.02):
+    """
+    Wait up to timeout seconds (None: forever) for a future resolved by a message from
+    the browser.  ipykernel does not handle comm messages while a cell is running, so in
+    a kernel they are processed meanwhile with jupyter_ui_poll (one capture pumps at a
+    time); `await chart.pixels_array_async()` then also completes inside the cell.
+    """
+    if not in_kernel():
+        return await asyncio.wait_for(result, timeout)
+    from jupyter_ui_poll import ui_events
+    loop = asyncio.get_event_loop()
+    lock = _pump_lock.get(loop)
+    if lock is None:
+        _pump_lock.clear()
+        lock = _pump_lock[loop] = asyncio.Lock()
+    deadline = None if timeout is None else loop.time() + timeout
+    async with ui_events() as poll:
+        while not result.done():
+            if deadline is not None and loop.time() >= deadline:
+                raise asyncio.TimeoutError()
+            async with lock:
+                if not result.done():
+                    await poll(10)
+            if not result.done():
+                await asyncio.sleep(poll_interval)
+    return result.result()
+
+def load_requirements(widget=None, silent=True, additional=(), force=False):
     """
     Load Javascript prerequisites into the notebook page context.
+
+    Unless force is set the Chart.js library is only sent when the page does not
+    already define window.Chart and no other widget is loading it.  Widgets
+    that skip the load wait for the pending load before drawing (see with_chart).
     """
     if widget is None:
         widget = jp_proxy_widget.JSProxyWidget()
         silent = False
+        force = True
     # Make sure jQuery and jQueryUI are loaded.
     widget.check_jquery()
     # load additional jQuery plugin code.
     all_requirements = list(required_javascript_modules) + list(additional)
-    widget.load_js_files(all_requirements)
+    loader_counters["requested"] += 1
+    if force or additional:
+        widget.js_init(LOADER_JS, report=None)
+        send_requirements(widget, all_requirements)
+    else:
+        def report(status):
+            if status == "missing":
+                send_requirements(widget, all_requirements)
+            else:
+                loader_counters["skipped"] += 1
+        widget.js_init(LOADER_JS, report=report)
     if not silent:
         widget.element.html("<div>Requirements for <b>chart_ipynb</b> have been loaded.</div>")
         display(widget)
 
+def send_requirements(widget, requirements):
+    "Send the Javascript files and release widgets waiting on the page level load."
+    loader_counters["sent"] += 1
+    widget.load_js_files(requirements)
+    widget.js_init("""
+        var registry = window.chart_ipynb_loader;
+        registry.pending = null;
+        registry.resolve();
+    """)
+
+LOADER_JS = """
+    var registry = window.chart_ipynb_loader;
+    if (!registry) {
+        registry = window.chart_ipynb_loader = {pending: null};
+    }
+    var status;
+    if (!report) {
+        status = "forced";
+    } else if (window.Chart) {
+        status = "loaded";
+    } else if (registry.pending) {
+        status = "pending";
+    } else {
+        status = "missing";
+    }
+    if (status == "loaded") {
+        element.chart_ready = Promise.resolve();
+    } else {
+        if (!registry.pending) {
+            registry.pending = new Promise(function (resolve) {
+                registry.resolve = resolve;
+            });
+        }
+        element.chart_ready = registry.pending;
+    }
+    // run chart operations in order, after Chart.js is available.
+    element.with_chart = function (action) {
+        element.chart_ready = element.chart_ready.then(action).catch(function (error) {
+            console.error(error);
+        });
+    };
+    if (report) {
+        report(status);
+    }
+"""
+
 class ChartSuperClass(jp_proxy_widget.JSProxyWidget):
 
     title = "Chart.js"
 
+    # How dataset arrays are sent to the browser: "json" lists, or base64
+    # encoded "float64" / "float32" typed array buffers (see utils.pack_config).
+    transport = "json"
+
+    # The transport of the last initialize_chart (None before the chart is set up);
+    # later incremental updates pack their arrays the same way.
+    transport_used = None
+
+    # Sliding window size for live charts: the Javascript side drops the oldest
+    # labels and points beyond max_points before each update (None: no limit).
+    max_points = None
+
+    # How pixels_array fetches the canvas: "hex" (jp_proxy_widget's encoding of
+    # byte arrays, the fastest to decode in Python) or "base64" (a third smaller).
+    pixel_encoding = "hex"
+
+    # The chart config given to initialize_chart (before any typed array packing).
+    config = None
+
+    # Click (and remove) events: how many are kept in clicked_info, and how long
+    # the browser collects events before sending them in one message (milliseconds).
+    event_history = 100
+    event_delay = 100
+
     def __init__(self, *pargs, **kwargs):
         super(ChartSuperClass, self).__init__(*pargs, **kwargs)
         load_requirements(self)
         self.element.html("Uninitialized Chart.js widget.")
-        self.clicked_info = []
+        self.clicked_info = collections.deque(maxlen=self.event_history)
+        self.click_call = None
         self.width = 800
+        self.recorder = instrumentation.Recorder()
+        # operations whose messages are not sent yet (see send_custom_message).
+        self.unsent_operations = []
+
+    def chart_js(self, js_function_body, operation="chart_js", **other_arguments):
+        """
+        Like js_init, but the function body runs only after Chart.js is available
+        on the page, in the order the calls were made.
+        operation: name of the call in the instrumentation records.
+        """
+        body = "element.with_chart(function () {\n" + js_function_body + "\n});"
+        if not instrumentation.enabled:
+            self.js_init(body, **other_arguments)
+            return
+        self.unsent_operations.append(operation)
+        started = instrumentation.now()
+        self.js_init(
+            instrumentation.reporter_js + body,
+            chart_operation=operation, sent_ms=time.time() * 1000.0,
+            report_stats=self.record_browser_stats, **other_arguments)
+        self.record(operation, "python_seconds", instrumentation.now() - started)
+
+    def send_custom_message(self, indicator, payload):
+        if not instrumentation.enabled:
+            return super(ChartSuperClass, self).send_custom_message(indicator, payload)
+        with instrumentation.packed_bytes() as sizes:
+            result = super(ChartSuperClass, self).send_custom_message(indicator, payload)
+        operations = list(collections.OrderedDict.fromkeys(getattr(self, "unsent_operations", [])))
+        self.unsent_operations = []
+        if sizes:
+            self.record("+".join(operations) or "send", "bytes", sum(sizes))
+        return result
+
+    def record(self, operation, metric, value):
+        "Add a measurement to this chart's and the process wide instrumentation records."
+        self.recorder.add(operation, metric, value)
+        instrumentation.process_recorder.add(operation, metric, value)
+
+    def record_since(self, operation, metric, started):
+        if instrumentation.enabled:
+            self.record(operation, metric, instrumentation.now() - started)
 
-    def initialize_chart(self, width, config):
+    def record_browser_stats(self, entries):
+        for (operation, metric, seconds) in entries:
+            self.record(operation, metric, seconds)
+
+    def stats(self, percentiles=(50, 90, 99)):
+        """
+        Summary of this chart's instrumentation records (see chart_ipynb.instrumentation;
+        empty unless instrumentation.enable() was called before the chart was used).
+        """
+        return self.recorder.summary(percentiles)
+
+    def initialize_chart(self, width, config, transport=None):
         
         self.width = width
-        self.js_init("""
+        self.config = config
+        started = instrumentation.now()
+        if transport is None:
+            transport = self.transport
+        self.transport_used = transport
+        if transport != "json":
+            config = utils.pack_config(config, transport)
+        config = utils.json_safe(config)
+        self.record_since("initialize_chart", "prepare_seconds", started)
+        self.chart_js("""
+            // rebuild arrays sent as base64 typed array buffers.
+            var unpack = function (data) {
+                if (!data || (typeof data != "object") || Array.isArray(data)) {
+                    return data;
+                }
+                if (data.typed_array) {
+                    var binary = atob(data.buffer);
+                    var bytes = new Uint8Array(binary.length);
+                    for (var i = 0; i < binary.length; i++) {
+                        bytes[i] = binary.charCodeAt(i);
+                    }
+                    var typed = new window[data.typed_array](bytes.buffer);
+                    var values = new Array(typed.length);
+                    for (var i = 0; i < typed.length; i++) {
+                        var v = typed[i];
+                        values[i] = (v === v) ? v : null;
+                    }
+                    return values;
+                }
+                if (data.typed_columns) {
+                    var names = Object.keys(data.typed_columns);
+                    var columns = names.map(function (name) {
+                        return unpack(data.typed_columns[name]);
+                    });
+                    var length = columns.length ? columns[0].length : 0;
+                    var points = new Array(length);
+                    for (var i = 0; i < length; i++) {
+                        var point = {};
+                        for (var j = 0; j < names.length; j++) {
+                            point[names[j]] = columns[j][i];
+                        }
+                        points[i] = point;
+                    }
+                    return points;
+                }
+                return data;
+            };
+            element.unpack_data = unpack;
+            var datasets = (config.data && config.data.datasets) || [];
+            for (var i = 0; i < datasets.length; i++) {
+                datasets[i].data = unpack(datasets[i].data);
+            }
+
             element.empty();
             element.width(width);
 
+            // track whether a render (including its animation) is still in progress.
+            // The constructor renders immediately, before chart_info exists.
+            var render_state = {rendering: true, waiters: []};
+            config.plugins = (config.plugins || []).concat([{
+                beforeRender: function () {
+                    render_state.rendering = true;
+                    render_state.started = performance.now();
+                },
+                afterRender: function () {
+                    render_state.rendering = false;
+                    if (element.chart_stats) {
+                        element.chart_stats.add(
+                            "render", "render_seconds", (performance.now() - render_state.started) / 1000.0);
+                    }
+                    if (element.chart_info) {
+                        element.chart_info.settle();
+                    }
+                },
+            }]);
             var canvas = $("<canvas></canvas>").appendTo(element);
             var ctx = canvas[0].getContext('2d');
             var chart = new Chart(ctx, config);
@@ -55,85 +340,286 @@ class ChartSuperClass(jp_proxy_widget.JSProxyWidget):
                 chart: chart,
                 canvas: canvas,
                 context: ctx,
+                max_points: max_points,
+                render_state: render_state,
+            };
+            // call back when no render or scheduled update is pending and the frame is painted.
+            element.chart_info.when_rendered = function (callback) {
+                render_state.waiters.push(callback);
+                element.chart_info.settle();
+            };
+            element.chart_info.settle = function () {
+                var chart_info = element.chart_info;
+                if (render_state.rendering || chart_info.update_pending || !render_state.waiters.length) {
+                    return;
+                }
+                var waiters = render_state.waiters;
+                render_state.waiters = [];
+                var next_frame = window.requestAnimationFrame || function (action) {
+                    return setTimeout(action, 16);
+                };
+                next_frame(function () {
+                    for (var i = 0; i < waiters.length; i++) {
+                        waiters[i](true);
+                    }
+                });
+            };
+            // coalesce chart updates requested within one animation frame.
+            element.chart_info.update_pending = false;
+            element.chart_info.schedule_update = function () {
+                var chart_info = element.chart_info;
+                if (chart_info.update_pending) {
+                    return;
+                }
+                chart_info.update_pending = true;
+                var next_frame = window.requestAnimationFrame || function (action) {
+                    return setTimeout(action, 16);
+                };
+                next_frame(function () {
+                    chart_info.update_pending = false;
+                    var max_points = chart_info.max_points;
+                    if (max_points) {
+                        var data = chart_info.chart.config.data;
+                        var arrays = (data.datasets || []).map(function (dataset) {
+                            return dataset.data;
+                        });
+                        arrays.push(data.labels || []);
+                        for (var i = 0; i < arrays.length; i++) {
+                            var excess = arrays[i].length - max_points;
+                            if (excess > 0) {
+                                arrays[i].splice(0, excess);
+                            }
+                        }
+                    }
+                    chart_info.chart.update();
+                });
             };
-            element.chart_info.get_pixels = function () {
-                debugger;
+            // elements under a mouse event (replaced by the scatter spatial index).
+            element.chart_info.element_at_event = function (event) {
+                return chart.getElementAtEvent(event);
+            };
+            // collect events and send them in one message at most every delay milliseconds,
+            // keeping only the newest limit events (all of them when limit is null).
+            element.chart_info.event_batcher = function (report, delay, limit) {
+                var pending = [];
+                var timer = null;
+                return function (event) {
+                    pending.push(event);
+                    if (limit && pending.length > limit) {
+                        pending.shift();
+                    }
+                    if (timer === null) {
+                        timer = setTimeout(function () {
+                            var events = pending;
+                            pending = [];
+                            timer = null;
+                            report(events);
+                        }, delay);
+                    }
+                };
+            };
+            element.chart_info.get_image = function (mime, quality) {
+                var url = element.chart_info.canvas[0].toDataURL(mime, quality);
+                var comma = url.indexOf(",");
+                // browsers without the requested encoder fall back to image/png.
+                return {"data": url.substring(comma + 1), "mime": url.substring(5, url.indexOf(";"))};
+            };
+            element.chart_info.get_pixels = function (encoding) {
                 var cv = element.chart_info.canvas[0];
                 var imgData = element.chart_info.context.getImageData(0, 0, cv.width, cv.height);
-                return {"data": imgData.data, "height": imgData.height, "width": imgData.width};
+                if (encoding != "base64") {
+                    // jp_proxy_widget sends byte arrays hex encoded.
+                    return {"data": imgData.data, "height": imgData.height, "width": imgData.width};
+                }
+                // base64 is 2/3 the size of the hex encoding.
+                var bytes = imgData.data;
+                var chunk = 0x8000;
+                var pieces = [];
+                for (var i = 0; i < bytes.length; i += chunk) {
+                    pieces.push(String.fromCharCode.apply(null, bytes.subarray(i, i + chunk)));
+                }
+                return {
+                    "data": btoa(pieces.join("")), "encoding": "base64",
+                    "height": imgData.height, "width": imgData.width,
+                };
             };
-        """, width=width, config=config)
+        """, operation="initialize_chart", width=width, config=config, max_points=self.max_points)
+
+    def wait_rendered(self, timeout=10.0, poll_interval=0.02):
+        """
+        Block until Chart.js has finished drawing (animations included) everything sent
+        so far and the frame is painted, e.g. between setup() and save_image().
+        Browser messages are processed meanwhile with jupyter_ui_poll.
+        Return True when the chart rendered, False if timeout seconds passed first.
+        """
+        import time
+        from jupyter_ui_poll import ui_events
+        rendered = []
+        def done(*ignored):
+            rendered.append(True)
+        self.chart_js("element.chart_info.when_rendered(done);", operation="wait_rendered", done=done)
+        deadline = time.monotonic() + timeout
+        with ui_events() as poll:
+            while not rendered and time.monotonic() < deadline:
+                poll(10)
+                if not rendered:
+                    time.sleep(poll_interval)
+        return bool(rendered)
 
     def print_info(self, info):
         self.clicked_info.append(info)
         # print(info)
 
-    def click_callback(self, callback=None):
+    def set_event_history(self, size):
+        "Keep the newest size click events in clicked_info."
+        self.event_history = size
+        self.clicked_info = collections.deque(self.clicked_info, maxlen=size)
 
-        self.js_init("""
-            var canvas = element.chart_info.canvas;
+    def click_callback(self, callback=None, delay=None):
+        """
+        Report clicks on chart elements: each click's info dict (see event_details) is
+        added to clicked_info and passed to callback(info).  The browser only sends
+        [datasetIndex, dataIndex] pairs, batched over delay milliseconds (event_delay).
+        """
+        if delay is None:
+            delay = self.event_delay
+        self.click_call = callback
+        self.chart_js("""
             var chart = element.chart_info.chart;
-            var canvas0 = canvas[0];
-            canvas0.onclick = function(event) {
-                var info = {};
-                console.log("onclick called" + event);
-                var data = chart.getElementAtEvent(event);
-                
-                console.log(data[0]);
-                var index = data[0]._index;
-                var dataset_index = data[0]._datasetIndex;
-                info.dataIndex = index;
-                info.datasetIndex = dataset_index;
-
-                var model = data[0]._model;
-                info.backgroundColor = model.backgroundColor;
-                info.borderColor = model.borderColor;
-                
-                var chart_info = data[0]._chart;
-                var chart_config = chart_info.config;
-                var dataset = chart_config.data.datasets[dataset_index];
-                info.datasetLabel = dataset.label;
-                info.label = chart_config.data.labels[index];
-                info.dataValue = dataset.data[index];
-                print_info(info);
-                click_call(info);
+            var send = element.chart_info.event_batcher(report_clicks, delay, limit);
+            element.chart_info.canvas[0].onclick = function(event) {
+                var data = element.chart_info.element_at_event(event);
+                if (!data.length) {
+                    return;
+                }
+                send([data[0]._datasetIndex, data[0]._index]);
             };
-        """, click_call = callback, print_info=self.print_info)
+        """, operation="click_callback", report_clicks=self.receive_clicks, delay=delay, limit=self.event_history)
+
+    def receive_clicks(self, events):
+        for (dataset_index, index) in events:
+            info = self.event_details(dataset_index, index)
+            self.print_info(info)
+            if self.click_call is not None:
+                self.click_call(info)
+
+    def event_details(self, dataset_index, index):
+        """
+        Info for the clicked element from the Python side chart data: dataIndex, datasetIndex,
+        datasetLabel, label, dataValue, backgroundColor and borderColor.
+        """
+        data = (self.config or {}).get("data", {})
+        return element_details(data.get("datasets", []), data.get("labels", []), dataset_index, index)
 
     def off_click_event(self):
-        self.js_init("""
+        self.chart_js("""
             var canvas = element.chart_info.canvas;
             var chart = element.chart_info.chart;
             var canvas0 = canvas[0];
             canvas0.onclick = function(event) {
                 // do nothing
             };
-        """)
-
-    def pixels_array(self):
-        import numpy as np
-        from jp_proxy_widget.hex_codec import hex_to_bytearray
-        imgData = self.element.chart_info.get_pixels().sync_value()
-        data_hex = imgData["data"]
-        width = imgData["width"]
-        height = imgData["height"]
-        data_bytes = hex_to_bytearray(data_hex)
-        bytes_per_pixel = 4
-        array1d = np.array(data_bytes, dtype=np.ubyte)
-        img_array = array1d.reshape((height, width, bytes_per_pixel))
-        return img_array
+        """, operation="off_click_event")
+
+    def pixels_array(self, encoding=None):
+        """
+        RGBA pixels of the chart canvas as a read only (height, width, 4) uint8 array.
+        encoding: "hex" or "base64" (default pixel_encoding).
+        """
+        if encoding is None:
+            encoding = self.pixel_encoding
+        imgData = self.element.chart_info.get_pixels(encoding).sync_value()
+        return decode_pixels(imgData)
+
+    def pixels_array_async(self, timeout=None, encoding=None):
+        "Future of pixels_array() which does not block the kernel while the browser responds."
+        return asyncio.ensure_future(self._pixels_array_async(timeout, encoding))
+
+    async def _pixels_array_async(self, timeout, encoding):
+        if encoding is None:
+            encoding = self.pixel_encoding
+        imgData = await self.capture_value("element.chart_info.get_pixels(encoding)", timeout, encoding=encoding)
+        return decode_pixels(imgData)
+
+    def capture_value(self, expression, timeout=None, **other_arguments):
+        """
+        Future of the value of a Javascript expression evaluated once the chart exists.
+        In a notebook, await it in the cell (the kernel's messages are processed while
+        it waits, see wait_for_browser); do not block on it.  The request waits for a
+        slot under capture_limits["concurrency"] and fails with asyncio.TimeoutError
+        after timeout seconds (default capture_limits["timeout"]).
+        """
+        return asyncio.ensure_future(self._capture_value(expression, timeout, other_arguments))
+
+    async def _capture_value(self, expression, timeout, other_arguments):
+        if timeout is None:
+            timeout = capture_limits["timeout"]
+        loop = asyncio.get_event_loop()
+        async with capture_semaphore():
+            result = loop.create_future()
+            def deliver(value):
+                if not result.done():
+                    result.set_result(value)
+            self.chart_js("deliver(" + expression + ");", operation="capture_value", deliver=deliver, **other_arguments)
+            return await wait_for_browser(result, timeout)
 
     def pil_image(self):
         from PIL import Image
         return Image.fromarray(self.pixels_array(), mode="RGBA")
 
-    def embed_image(self):
-        from IPython.display import display
-        display(self.pil_image())
+    def image_bytes(self, format="png", quality=None):
+        """
+        The chart canvas compressed by the browser (canvas.toDataURL).
+        format: 'png', 'webp' or 'jpeg'; quality: 0..1 for lossy formats.
+        """
+        format = format.lower()
+        image = self.element.chart_info.get_image(image_formats[format], quality).sync_value()
+        return decode_image(image, format)
+
+    def image_bytes_async(self, format="png", quality=None, timeout=None):
+        "Future of image_bytes() which does not block the kernel while the browser responds."
+        return asyncio.ensure_future(self._image_bytes_async(format, quality, timeout))
 
-    def save_image(self, to_path):
-        im = self.pil_image()
-        im.save(to_path)
+    async def _image_bytes_async(self, format, quality, timeout):
+        format = format.lower()
+        image = await self.capture_value(
+            "element.chart_info.get_image(mime, quality)", timeout,
+            mime=image_formats[format], quality=quality)
+        return decode_image(image, format)
+
+    def embed_image(self, format="png", quality=None):
+        from IPython.display import display, Image
+        display(Image(data=self.image_bytes(format, quality)))
+
+    def save_image(self, to_path, quality=None):
+        """
+        Save the chart image.  For .png, .webp and .jpg/.jpeg paths the browser encodes
+        the image and the bytes are written as they are; other formats go through PIL.
+        """
+        extension = image_extension(to_path)
+        if extension not in image_formats:
+            im = self.pil_image()
+            im.save(to_path)
+            return
+        data = self.image_bytes(extension, quality)
+        write_bytes(to_path, data)
+
+    def save_image_async(self, to_path, quality=None, timeout=None):
+        """
+        Future for save_image(): many charts can be saved at once from a notebook cell with
+        await asyncio.gather(*[c.save_image_async(path) for (c, path) in ...]).
+        """
+        return asyncio.ensure_future(self._save_image_async(to_path, quality, timeout))
+
+    async def _save_image_async(self, to_path, quality, timeout):
+        extension = image_extension(to_path)
+        if extension not in image_formats:
+            from PIL import Image
+            pixels = await self.pixels_array_async(timeout)
+            Image.fromarray(pixels, mode="RGBA").save(to_path)
+            return
+        data = await self.image_bytes_async(extension, quality, timeout)
+        write_bytes(to_path, data)
 
     def default_options(self):
         true = True
@@ -150,8 +636,7 @@ class ChartSuperClass(jp_proxy_widget.JSProxyWidget):
         self.options["title"]["text"] = title
 
     def config_json(self, config):
-        import json
-        return json.dumps(config)
+        return utils.dumps(utils.unpack_config(config))
 
     def html_script(self, chart):
         input_config = self.config_json(chart.config)
@@ -171,6 +656,83 @@ class ChartSuperClass(jp_proxy_widget.JSProxyWidget):
         """%(str(self.width),input_config)
         return html_chart
 
+def element_details(datasets, labels, dataset_index, index):
+    "Info dict for element index of dataset dataset_index (None for anything out of range)."
+    def item(values, index):
+        try:
+            if utils.is_typed(values):
+                # decode just this element, not the whole column.
+                return utils.unpack_item(values, index)
+            if values is None or isinstance(values, (str, dict)):
+                return values
+            return values[index]
+        except (IndexError, TypeError):
+            return None
+    info = dict(dataIndex=index, datasetIndex=dataset_index)
+    dataset = item(datasets, dataset_index) or {}
+    info["backgroundColor"] = item(dataset.get("backgroundColor"), index)
+    info["borderColor"] = item(dataset.get("borderColor"), index)
+    info["datasetLabel"] = dataset.get("label")
+    info["label"] = item(labels, index)
+    info["dataValue"] = item(dataset.get("data"), index)
+    return info
+
+image_formats = {
+    "png": "image/png",
+    "webp": "image/webp",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+}
+
+def image_extension(to_path):
+    "Lower case file extension of a path or file object ('' when unknown)."
+    import os
+    if isinstance(to_path, (str, os.PathLike)):
+        name = os.fspath(to_path)
+    else:
+        name = getattr(to_path, "name", "")
+    return os.path.splitext(str(name))[1][1:].lower()
+
+def write_bytes(to_path, data):
+    if hasattr(to_path, "write"):
+        to_path.write(data)
+    else:
+        with open(to_path, "wb") as f:
+            f.write(data)
+
+def decode_image(image, format=None):
+    """
+    Bytes of the encoded image payload from chart_info.get_image.  If the browser
+    could not produce the requested format (it falls back to PNG) the image
+    is converted with PIL.
+    """
+    import binascii
+    data = binascii.a2b_base64(image["data"])
+    if format is not None and image["mime"] != image_formats[format]:
+        import io
+        from PIL import Image
+        output = io.BytesIO()
+        Image.open(io.BytesIO(data)).save(output, format=image_formats[format].split("/")[1].upper())
+        data = output.getvalue()
+    return data
+
+def decode_pixels(imgData):
+    """
+    Wrap the pixel payload from chart_info.get_pixels as a (height, width, 4)
+    array without copying the decoded bytes (the array is read only).
+    Hex payloads decode about three times faster than base64 ones, which are a
+    third smaller (see benchmarks/bench_pixels.py).
+    """
+    import binascii
+    import numpy as np
+    if imgData.get("encoding") == "base64":
+        data_bytes = binascii.a2b_base64(imgData["data"])
+    else:
+        data_bytes = binascii.unhexlify(imgData["data"])
+    bytes_per_pixel = 4
+    array1d = np.frombuffer(data_bytes, dtype=np.ubyte)
+    return array1d.reshape((imgData["height"], imgData["width"], bytes_per_pixel))
+
 def example_donut():
     "just a test."
     chartColors = dict(
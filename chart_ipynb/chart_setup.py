@@ -1,8 +1,10 @@
 from . import chart_framework
 from . import utils
-import pandas as pd
+from . import decimation
+from . import instrumentation
 import numpy as np
 import random
+import collections
 
 
 class Chart_init(chart_framework.ChartSuperClass):
@@ -11,20 +13,115 @@ class Chart_init(chart_framework.ChartSuperClass):
     chart_type = 'line'
     config = None
 
-    def __init__(self, options=None, title = None, *pargs, **kwargs):
+    def __init__(self, options=None, title = None, max_points = None, *pargs, **kwargs):
         super(Chart_init, self).__init__(*pargs, **kwargs)
         if options is None:
             options = self.default_options()
         if title is not None:
             self.title = title
         self.options = options
+        self.max_points = max_points
         self.labels = []
         self.data = []
         self.colors = []
         self.datasets = []
         self.dataset_name = []
-        self.remove_item = []
+        self.remove_item = collections.deque(maxlen=self.event_history)
+
+    # labels and dataset names are kept in IndexedLists for O(1) lookups,
+    # whatever sequence is assigned to them (an IndexedList is kept as it is).
+    @property
+    def labels(self):
+        return self._labels
+
+    @labels.setter
+    def labels(self, values):
+        if self.max_points:
+            self._labels = utils.RingBuffer(self.max_points, object, values, indexed=True)
+        else:
+            self._labels = utils.indexed_list(values)
+
+    @property
+    def dataset_name(self):
+        return self._dataset_name
+
+    @dataset_name.setter
+    def dataset_name(self, values):
+        self._dataset_name = utils.indexed_list(values)
     
+    def set_window(self, max_points):
+        """
+        Keep only the last max_points labels and points of each dataset
+        (sliding window for live charts).  None keeps everything.
+        """
+        self.max_points = max_points
+        self.labels = utils.to_list(self.labels)[-max_points:] if max_points else utils.to_list(self.labels)
+        for dataset in self.datasets:
+            data = dataset['data']
+            if not isinstance(data, utils.PointColumns):
+                data = utils.to_list(data)
+            dataset['data'] = self.windowed(data)
+        if self.config is not None:
+            self.chart_js("""
+                element.chart_info.max_points = max_points;
+                element.chart_info.schedule_update();
+            """, operation="set_window", max_points=max_points)
+
+    def windowed(self, data):
+        "Ring buffer holding the last max_points of data in window mode, otherwise data."
+        if isinstance(data, utils.PointColumns):
+            # point columns keep their columnar form, bounded to the window.
+            return data.windowed(self.max_points)
+        if not self.max_points or isinstance(data, utils.RingBuffer):
+            return data
+        data = utils.to_list(data)
+        try:
+            return utils.RingBuffer(self.max_points, float, data)
+        except (TypeError, ValueError):
+            return utils.RingBuffer(self.max_points, object, data)
+
+    def plain_datasets(self):
+        "The datasets with any ring buffers converted to lists for sending to Javascript."
+        if not self.max_points:
+            return self.datasets
+        return [dict(dataset, data=utils.to_list(dataset['data']))
+                if isinstance(dataset['data'], utils.RingBuffer) else dataset
+                for dataset in self.datasets]
+
+    def downsample(self, max_points, method="lttb"):
+        """
+        Reduce the datasets to about max_points points each before setup(),
+        keeping the shared labels aligned with the data.
+        method: 'lttb' (Largest-Triangle-Three-Buckets)
+                or 'minmax' (minimum and maximum of buckets, max_points in all)
+        """
+        columns = [np.asarray(utils.to_list(dataset['data']), dtype=float) for dataset in self.datasets]
+        lengths = set(len(column) for column in columns)
+        if self.labels:
+            lengths.add(len(self.labels))
+        if len(lengths) > 1:
+            print('datasets must have the same length as the labels to downsample')
+            raise ValueError
+        if not columns or max(lengths) <= max_points:
+            return
+        keep = decimation.keep_indices(columns, max_points, method)
+        if self.labels:
+            labels = utils.to_list(self.labels)
+            self.labels = [labels[i] for i in keep]
+        for (dataset, column) in zip(self.datasets, columns):
+            data = column[keep]
+            dataset['data'] = self.windowed([None if v != v else v for v in data.tolist()])
+
+    def decimate(self, width=None):
+        """
+        Min/max decimation to pixel width buckets of the chart width, split between
+        the datasets: each keeps the minimum and maximum of each of its buckets, and
+        at most about 2 * width points are sent however many datasets there are.
+        """
+        if width is None:
+            width = self.width
+        self.downsample(2 * width, method="minmax")
+
     def add(self, label, datum, color):
         self.labels.append(label)
         self.data.append(datum)
@@ -62,6 +159,8 @@ class Chart_init(chart_framework.ChartSuperClass):
                         fill = fill,
                         **other_arguments,
                     )
+        if self.max_points:
+            _dataset['data'] = self.windowed(_dataset['data'])
         self.datasets.append(_dataset)
 
     def get_ready_data(self, label, backgroundColor=None, borderColor=None, fill = False, **other_arguments):
@@ -80,20 +179,22 @@ class Chart_init(chart_framework.ChartSuperClass):
                         **other_arguments,
                         )
 
-    def setup(self, width=800, **other_arguments): 
+    def setup(self, width=800, transport=None, **other_arguments): 
+        started = instrumentation.now()
         if not self.datasets:
             self.add_dataset(self.labels, self.data, "My dataset", color=self.colors)
         config = utils.config(
             type=self.chart_type,
             data=utils.data(
-                datasets=self.datasets,
-                labels = self.labels,
+                datasets=self.plain_datasets(),
+                labels = utils.to_list(self.labels) if self.max_points else self.labels,
             ),
             options=self.options,
             **other_arguments,
         )
         self.config = config
-        self.initialize_chart(width, config)
+        self.record_since("setup", "build_seconds", started)
+        self.initialize_chart(width, config, transport)
 
     def reset(self):
         self.labels = []
@@ -153,18 +254,68 @@ class Chart_init(chart_framework.ChartSuperClass):
             if data_value==self.datasets[dataset_index]['data'][label_index]:
                 print("The data has been existed")
                 raise ValueError
-        self.js_init("""
+        self.chart_js("""
             element.chart_info.chart.config.data.datasets[dataset_index].data.push(data_value);
             if (add_label) {
                 element.chart_info.chart.config.data.labels.push(label);
             };
-            element.chart_info.chart.update();
-        """, data_value = data_value, label = label, dataset_index = dataset_index,
+            element.chart_info.schedule_update();
+        """, operation="update_data", data_value = data_value, label = label, dataset_index = dataset_index,
              add_label = add_label)
         self.datasets[dataset_index]['data'].append(data_value)
 
 
 
+    def extend(self, values, labels=None, dataset_name=None):
+        """
+        Append many points in one message.
+        values: a sequence of values for one dataset (the first one by default)
+                or a dict {dataset_name: sequence of values} for several datasets
+        labels: labels for the new points; labels already on the chart are not repeated
+        """
+        if not isinstance(values, dict):
+            if dataset_name is None:
+                dataset_name = self.dataset_name[0]
+            values = {dataset_name: values}
+        transport = self.transport_used or self.transport
+        updates = []
+        for name in values:
+            dataset_index = self.dataset_name.index(name)
+            target = self.datasets[dataset_index]['data']
+            if isinstance(target, utils.PointColumns):
+                data = utils.PointColumns.from_points(values[name], target.names)
+            else:
+                data = utils.to_list(values[name])
+            target.extend(data)
+            if transport != "json":
+                data = utils.pack_data(data, transport)
+            elif isinstance(data, utils.PointColumns):
+                data = data.tolist()
+            updates.append([dataset_index, data])
+        new_labels = []
+        for label in utils.to_list(labels):
+            if label not in self.labels:
+                self.labels.append(label)
+                new_labels.append(label)
+        self.chart_js("""
+            var chart_info = element.chart_info;
+            var datasets = chart_info.chart.config.data.datasets;
+            for (var i = 0; i < updates.length; i++) {
+                var target = datasets[updates[i][0]].data;
+                var data = element.unpack_data(updates[i][1]);
+                for (var j = 0; j < data.length; j++) {
+                    target.push(data[j]);
+                }
+            }
+            var chart_labels = chart_info.chart.config.data.labels;
+            for (var i = 0; i < labels.length; i++) {
+                chart_labels.push(labels[i]);
+            }
+            chart_info.schedule_update();
+        """, operation="extend", updates=updates, labels=new_labels)
+
+    append_many = extend
+
     def update_dataset(self, data, label=None, color = None, backgroundColor=None, borderColor=None, **other_arguments):
         
         if color is None:
@@ -188,10 +339,18 @@ class Chart_init(chart_framework.ChartSuperClass):
                     **other_arguments,)
         self.datasets.append(dataset)
         self.dataset_name.append(label)
-        self.js_init("""
+        self.chart_js("""
             element.chart_info.chart.config.data.datasets.push(dataset)
-            element.chart_info.chart.update();
-        """, dataset = dataset)
+            element.chart_info.schedule_update();
+        """, operation="update_dataset", dataset = dataset)
+
+    def set_event_history(self, size):
+        "Keep the newest size click events in clicked_info and removals in remove_item."
+        super(Chart_init, self).set_event_history(size)
+        self.remove_item = collections.deque(self.remove_item, maxlen=size)
+
+    def event_details(self, dataset_index, index):
+        return chart_framework.element_details(self.datasets, self.labels, dataset_index, index)
 
     def callback_info(self, info, remove_label, remove_data):
             self.remove_item.append(info)
@@ -205,17 +364,25 @@ class Chart_init(chart_framework.ChartSuperClass):
                     dataset['data'].pop(info['dataIndex'])
 
 
-    def remove_data(self):
-
-
-        self.js_init("""
+    def remove_data(self, delay=None):
+        """
+        Remove clicked elements.  The browser sends the removals as compact
+        [datasetIndex, dataIndex, remove_label, remove_data] lists batched over
+        delay milliseconds (event_delay); none are dropped, but only the newest
+        event_history are kept in remove_item.
+        """
+        if delay is None:
+            delay = self.event_delay
+        self.chart_js("""
+            var send = element.chart_info.event_batcher(report_removals, delay, limit);
             var canvas = element.chart_info.canvas;
             var chart = element.chart_info.chart;
             var canvas0 = canvas[0];
             canvas0.onclick = function(event) {
-                var remove_info = {};
-                var data = chart.getElementAtEvent(event);
-                console.log(data[0]);
+                var data = element.chart_info.element_at_event(event);
+                if (!data.length) {
+                    return;
+                }
                 var index = data[0]._index;
                 var dataset_index = data[0]._datasetIndex;
                 
@@ -259,12 +426,15 @@ class Chart_init(chart_framework.ChartSuperClass):
                     }
                 }
 
-                remove_info.dataIndex = index;
-                remove_info.datasetIndex = dataset_index;
-                element.chart_info.chart.update();
-                callback_info(remove_info, remove_label, remove_data);
+                element.chart_info.schedule_update();
+                send([dataset_index, index, remove_label, remove_data]);
             };
-        """, callback_info = self.callback_info)
+        """, operation="remove_data", report_removals = self.receive_removals, delay = delay, limit = None)
+
+    def receive_removals(self, events):
+        for (dataset_index, index, remove_label, remove_data) in events:
+            info = {'datasetIndex': dataset_index, 'dataIndex': index}
+            self.callback_info(info, remove_label, remove_data)
 
     def remove_dataset(self, dataset_name):
 
@@ -273,7 +443,7 @@ class Chart_init(chart_framework.ChartSuperClass):
             return 
         dataset_idx = self.dataset_name.index(dataset_name)
 
-        self.js_init("""
+        self.chart_js("""
             var canvas = element.chart_info.canvas;
             var chart = element.chart_info.chart;
             console.log(chart);
@@ -282,9 +452,9 @@ class Chart_init(chart_framework.ChartSuperClass):
             var dataset = datasets[dataset_index];
             
             datasets.splice(dataset_index,1);
-            element.chart_info.chart.update();
+            element.chart_info.schedule_update();
             remove_callback(dataset);
-        """, dataset_index = dataset_idx, remove_callback = remove_callback)
+        """, operation="remove_dataset", dataset_index = dataset_idx, remove_callback = remove_callback)
         self.datasets.pop(dataset_idx)
         self.dataset_name.pop(dataset_idx)
     
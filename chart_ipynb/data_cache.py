@@ -0,0 +1,256 @@
+"""
+On disk cache for remote time series (pandas_datareader style readers).
+
+Rows are stored per (source, symbol) as Parquet (or pickle when pyarrow is not
+installed) together with the date intervals that were fetched, so a request that
+overlaps cached data only fetches the missing sub-ranges.  Fetched intervals expire
+after ttl seconds and whole entries are evicted least recently used first once the
+cache grows past max_bytes.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import threading
+import time
+import pandas as pd
+
+one_day = datetime.timedelta(days=1)
+
+def as_date(value):
+    "datetime.date for a date, datetime, Timestamp or 'yyyy-m-d' string."
+    if isinstance(value, str):
+        return pd.Timestamp(value).date()
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return pd.Timestamp(value).date()
+
+def missing_ranges(intervals, start, end):
+    "Sub-ranges of the inclusive [start, end] date range not covered by the (start, end) intervals."
+    gaps = []
+    cursor = start
+    for (low, high) in sorted(intervals):
+        if high < cursor:
+            continue
+        if low > end:
+            break
+        if low > cursor:
+            gaps.append((cursor, low - one_day))
+        cursor = max(cursor, high + one_day)
+        if cursor > end:
+            break
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+def merge_ranges(intervals):
+    """
+    Merge overlapping or adjacent (start, end, fetched_at) intervals.
+    A merged interval keeps the oldest fetch time so it never outlives its data.
+    """
+    merged = []
+    for (low, high, fetched_at) in sorted(intervals):
+        if merged and low <= merged[-1][1] + one_day:
+            (mlow, mhigh, mfetched) = merged[-1]
+            merged[-1] = (mlow, max(mhigh, high), min(mfetched, fetched_at))
+        else:
+            merged.append((low, high, fetched_at))
+    return merged
+
+def data_reader(symbol, source, start, end, **other_arguments):
+    "Default reader: pandas_datareader.data.DataReader."
+    import pandas_datareader.data as web
+    return web.DataReader(symbol, source, start, end, **other_arguments)
+
+def parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def default_directory():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "chart_ipynb", "datareader")
+
+class DataCache:
+
+    index_name = "index.json"
+
+    def __init__(self, directory=None, ttl=24 * 3600, max_bytes=256 * 2**20,
+                 reader=None, format=None, clock=time.time):
+        """
+        directory: where frames and index.json are kept (default ~/.cache/chart_ipynb/datareader)
+        ttl: seconds a fetched interval stays valid (None: forever)
+        max_bytes: total size of cached frames before least recently used entries are evicted
+        reader: reader(symbol, source, start, end, **other_arguments) -> pd.DataFrame indexed by date
+        format: 'parquet' or 'pickle' (default parquet when pyarrow is installed)
+        """
+        if directory is None:
+            directory = default_directory()
+        if format is None:
+            format = "parquet" if parquet_available() else "pickle"
+        if format not in ("parquet", "pickle"):
+            print("format should be 'parquet' or 'pickle'")
+            raise ValueError(format)
+        if reader is None:
+            reader = data_reader
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.reader = reader
+        self.format = format
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.fetches = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, symbol, source, start, end, **other_arguments):
+        """
+        Rows of symbol from source for the inclusive date range, fetching only the
+        parts of the range that are not cached (or expired).  other_arguments
+        (e.g. api_key) are passed to the reader and are not part of the cache key.
+        """
+        start = as_date(start)
+        end = as_date(end)
+        key = self.key(source, symbol)
+        with self.lock:
+            entry = self.read_index().get(key)
+        now = self.clock()
+        intervals = []
+        frame = None
+        if entry is not None:
+            frame = self.load_frame(entry["file"])
+        if frame is not None:
+            intervals = [
+                (as_date(low), as_date(high), fetched_at)
+                for (low, high, fetched_at) in entry["intervals"]
+                if self.ttl is None or now - fetched_at <= self.ttl
+            ]
+        gaps = missing_ranges([(low, high) for (low, high, _) in intervals], start, end)
+        if not gaps:
+            self.hits += 1
+        pieces = [] if frame is None else [frame]
+        for (low, high) in gaps:
+            fetched = self.reader(symbol, source, to_datetime(low), to_datetime(high), **other_arguments)
+            self.fetches += 1
+            pieces.append(fetched)
+            intervals.append((low, high, now))
+        if gaps:
+            frame = combine(pieces)
+        self.store(key, source, symbol, frame, merge_ranges(intervals), write=bool(gaps))
+        return select_dates(frame, start, end)
+
+    def store(self, key, source, symbol, frame, intervals, write=True):
+        filename = self.filename(key)
+        if write:
+            path = os.path.join(self.directory, filename)
+            temporary = path + ".%s.tmp" % threading.get_ident()
+            if self.format == "parquet":
+                frame.to_parquet(temporary)
+            else:
+                frame.to_pickle(temporary)
+            os.replace(temporary, path)
+        with self.lock:
+            index = self.read_index()
+            entry = dict(
+                source=source,
+                symbol=symbol,
+                file=filename,
+                intervals=[[low.isoformat(), high.isoformat(), fetched_at] for (low, high, fetched_at) in intervals],
+                bytes=os.path.getsize(os.path.join(self.directory, filename)),
+                last_used=self.clock(),
+            )
+            index[key] = entry
+            self.evict(index, keep=key)
+            self.write_index(index)
+        return entry
+
+    def evict(self, index, keep=None):
+        "Drop least recently used entries (never keep) until the total size fits max_bytes."
+        if self.max_bytes is None:
+            return
+        total = sum(entry["bytes"] for entry in index.values())
+        for key in sorted(index, key=lambda key: index[key]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            entry = index.pop(key)
+            total -= entry["bytes"]
+            path = os.path.join(self.directory, entry["file"])
+            if os.path.exists(path):
+                os.remove(path)
+
+    def total_bytes(self):
+        with self.lock:
+            return sum(entry["bytes"] for entry in self.read_index().values())
+
+    def clear(self):
+        with self.lock:
+            for entry in self.read_index().values():
+                path = os.path.join(self.directory, entry["file"])
+                if os.path.exists(path):
+                    os.remove(path)
+            self.write_index({})
+
+    def key(self, source, symbol):
+        return "%s/%s" % (source, symbol)
+
+    def filename(self, key):
+        extension = "parquet" if self.format == "parquet" else "pkl"
+        return hashlib.sha1(key.encode("utf-8")).hexdigest() + "." + extension
+
+    def load_frame(self, filename):
+        path = os.path.join(self.directory, filename)
+        if not os.path.exists(path):
+            return None
+        if filename.endswith(".parquet"):
+            return pd.read_parquet(path)
+        return pd.read_pickle(path)
+
+    def read_index(self):
+        path = os.path.join(self.directory, self.index_name)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def write_index(self, index):
+        path = os.path.join(self.directory, self.index_name)
+        temporary = path + ".tmp"
+        with open(temporary, "w") as f:
+            json.dump(index, f)
+        os.replace(temporary, path)
+
+def to_datetime(date):
+    return datetime.datetime(date.year, date.month, date.day)
+
+def combine(frames):
+    "Concatenate fetched frames, later rows replacing earlier rows with the same date."
+    frames = [frame for frame in frames if frame is not None and len(frame)]
+    if not frames:
+        return pd.DataFrame()
+    frame = pd.concat(frames)
+    frame = frame[~frame.index.duplicated(keep="last")]
+    return frame.sort_index()
+
+def select_dates(frame, start, end):
+    if not len(frame):
+        return frame
+    dates = pd.DatetimeIndex(frame.index).normalize()
+    keep = (dates >= pd.Timestamp(start)) & (dates <= pd.Timestamp(end))
+    return frame[keep]
+
+default_cache = None
+
+def shared_cache():
+    "The process wide DataCache in the default directory."
+    global default_cache
+    if default_cache is None:
+        default_cache = DataCache()
+    return default_cache
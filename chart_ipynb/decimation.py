@@ -0,0 +1,102 @@
+"""
+Server side decimation of large series before they are sent to Chart.js.
+
+All functions return sorted integer index arrays into the original series so
+that shared labels can be subset together with every dataset.
+"""
+
+import numpy as np
+
+def lttb_indices(y, n_out, x=None):
+    """
+    Indices of the n_out points kept by Largest-Triangle-Three-Buckets
+    downsampling of the series y (x defaults to the positions 0..len(y)-1).
+    The first and last points are always kept.  NaN values are never preferred.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])
+    if x is None:
+        x = np.arange(n, dtype=float)
+    else:
+        x = np.asarray(x, dtype=float)
+    filled = np.where(np.isnan(y), 0.0, y)
+    # n - 2 interior points in n_out - 2 buckets; bucket b is edges[b]:edges[b+1].
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    counts = np.diff(edges)
+    x_sums = np.concatenate(([0.0], np.cumsum(x)))
+    y_sums = np.concatenate(([0.0], np.cumsum(filled)))
+    x_means = (x_sums[edges[1:]] - x_sums[edges[:-1]]) / counts
+    y_means = (y_sums[edges[1:]] - y_sums[edges[:-1]]) / counts
+    # the last "next bucket" is the final point itself.
+    x_means = np.append(x_means, x[n - 1])
+    y_means = np.append(y_means, filled[n - 1])
+    selected = np.empty(n_out, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    nan = np.isnan(y)
+    for b in range(n_out - 2):
+        lo = edges[b]
+        hi = edges[b + 1]
+        ax = x[a]
+        ay = filled[a]
+        cx = x_means[b + 1]
+        cy = y_means[b + 1]
+        area = np.abs((ax - cx) * (filled[lo:hi] - ay) - (ax - x[lo:hi]) * (cy - ay))
+        area[nan[lo:hi]] = -1.0
+        a = lo + int(np.argmax(area))
+        selected[b + 1] = a
+    return selected
+
+def minmax_indices(y, n_buckets):
+    """
+    Indices of the minimum and maximum of y in each of n_buckets equal width
+    position buckets, so every spike stays visible with at most 2 * n_buckets
+    points.  NaN values are ignored unless a bucket has nothing else.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+    bucket = (np.arange(n) * n_buckets) // n
+    starts = np.searchsorted(bucket, np.arange(n_buckets))
+    counts = np.diff(np.append(starts, n))
+    nan = np.isnan(y)
+    keep = []
+    for (fill, reduce) in ((np.inf, np.minimum), (-np.inf, np.maximum)):
+        filled = np.where(nan, fill, y)
+        extremes = reduce.reduceat(filled, starts)
+        candidates = np.flatnonzero(filled == np.repeat(extremes, counts))
+        # first candidate in each bucket
+        (_, first) = np.unique(bucket[candidates], return_index=True)
+        keep.append(candidates[first])
+    return np.union1d(keep[0], keep[1])
+
+methods = {
+    "lttb": lttb_indices,
+    # max_points counts both the minimum and the maximum of each bucket.
+    "minmax": lambda y, max_points: minmax_indices(y, max(1, max_points // 2)),
+}
+
+# methods that split max_points between the columns, so their union stays within it.
+split_methods = ("minmax",)
+
+def keep_indices(columns, max_points, method="lttb"):
+    """
+    Sorted indices kept for the columns, shared so datasets with one label array
+    stay aligned: the union of the indices chosen for each column.  minmax gives
+    each column max_points / len(columns) points, keeping the extremes of every
+    column with at most max_points positions in all.
+    """
+    decimate = methods[method]
+    if method in split_methods and columns:
+        max_points = max(2, max_points // len(columns))
+    keep = None
+    for column in columns:
+        indices = decimate(column, max_points)
+        keep = indices if keep is None else np.union1d(keep, indices)
+    return keep
@@ -0,0 +1,165 @@
+"""
+Opt-in timing and payload size records for chart widgets.
+
+    from chart_ipynb import instrumentation
+    instrumentation.enable()
+    ... build and update charts ...
+    chart.stats()                       # this chart
+    instrumentation.aggregate_stats()   # every chart in the process
+
+Records are grouped by operation (named by the ChartSuperClass method that sent
+Javascript, e.g. initialize_chart, update_data, remove_dataset, and "render"
+for Chart.js renders) and metric:
+
+    build_seconds      Python time spent assembling the config (setup)
+    prepare_seconds    Python time converting the config for sending
+    python_seconds     Python time of the js_init call (serialization and send)
+    bytes              size of the widget messages as packed by the kernel session;
+                       calls buffered until the widget is displayed are counted
+                       together, under their operations joined by "+"
+    transfer_seconds   from sending in Python to running in the browser
+    render_seconds     Chart.js render time, animations included
+
+Browser side measurements are reported back in batches about once a second.
+Count, total and max cover every value; percentiles cover the most recent
+`samples` values of each metric, so long streaming sessions use bounded memory.
+"""
+
+import collections
+import contextlib
+import time
+import numpy as np
+
+enabled = False
+
+def enable(on=True):
+    "Start (or with on=False stop) recording for charts in this process."
+    global enabled
+    enabled = on
+
+def disable():
+    enable(False)
+
+# values kept per operation and metric for the percentiles.
+samples = 1000
+
+class Samples(object):
+
+    "Running count, total and max of a metric, with its most recent values."
+
+    def __init__(self, size=None):
+        self.count = 0
+        self.total = 0.0
+        self.max = None
+        self.recent = collections.deque(maxlen=size or samples)
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if self.max is None or value > self.max:
+            self.max = value
+        self.recent.append(value)
+
+    def summary(self, percentiles=(50, 90, 99)):
+        result = dict(count=self.count, total=float(self.total), mean=float(self.total / self.count),
+                      max=float(self.max))
+        for (p, value) in zip(percentiles, np.percentile(np.asarray(self.recent, dtype=float), percentiles)):
+            result["p%s" % p] = float(value)
+        return result
+
+class Recorder(object):
+
+    "Samples per operation and metric."
+
+    def __init__(self, size=None):
+        self.size = size
+        self.records = {}
+
+    def add(self, operation, metric, value):
+        metrics = self.records.setdefault(operation, {})
+        values = metrics.get(metric)
+        if values is None:
+            values = metrics[metric] = Samples(self.size)
+        values.add(value)
+
+    def clear(self):
+        self.records = {}
+
+    def summary(self, percentiles=(50, 90, 99)):
+        "{operation: {metric: {count, total, mean, max, p50, ...}}}"
+        return {
+            operation: {metric: values.summary(percentiles) for (metric, values) in metrics.items()}
+            for (operation, metrics) in self.records.items()
+        }
+
+def summarize(values, percentiles=(50, 90, 99)):
+    "Summary (count, total, mean, max, pNN) of a sequence of values."
+    summary = Samples(max(1, len(values)))
+    for value in values:
+        summary.add(value)
+    return summary.summary(percentiles)
+
+process_recorder = Recorder()
+
+def aggregate_stats(percentiles=(50, 90, 99)):
+    "Summary of the records of every chart in the process."
+    return process_recorder.summary(percentiles)
+
+def reset():
+    process_recorder.clear()
+
+def kernel_session():
+    "The IPython kernel's jupyter_client Session (None outside a kernel)."
+    try:
+        from IPython import get_ipython
+    except ImportError:
+        return None
+    kernel = getattr(get_ipython(), "kernel", None)
+    return getattr(kernel, "session", None)
+
+@contextlib.contextmanager
+def packed_bytes():
+    """
+    List of the sizes of everything the kernel session serializes within the block:
+    the bytes of the messages actually sent, measured without serializing them again.
+    """
+    sizes = []
+    session = kernel_session()
+    if session is None:
+        yield sizes
+        return
+    pack = session.pack
+    def measured_pack(value):
+        packed = pack(value)
+        sizes.append(len(packed))
+        return packed
+    session.pack = measured_pack
+    try:
+        yield sizes
+    finally:
+        session.pack = pack
+
+def now():
+    return time.perf_counter()
+
+# Prepended to instrumented chart_js bodies: set up batched reporting of browser
+# side measurements and record the transfer time of this call.
+reporter_js = """
+    if (!element.chart_stats) {
+        element.chart_stats = {pending: [], scheduled: false, report: report_stats};
+        element.chart_stats.add = function (operation, metric, seconds) {
+            var stats = element.chart_stats;
+            stats.pending.push([operation, metric, seconds]);
+            if (!stats.scheduled) {
+                stats.scheduled = true;
+                setTimeout(function () {
+                    var pending = stats.pending;
+                    stats.pending = [];
+                    stats.scheduled = false;
+                    stats.report(pending);
+                }, 1000);
+            }
+        };
+    }
+    element.chart_stats.add(chart_operation, "transfer_seconds", (Date.now() - sent_ms) / 1000.0);
+"""
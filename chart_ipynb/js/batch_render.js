@@ -0,0 +1,70 @@
+// Render Chart.js configs to PNG files in a pool of headless browser pages.
+//
+// usage: node batch_render.js job.json
+//
+// The job file is written by chart_ipynb.batch_render.render_charts.
+// Chart.js is loaded once per page and each page renders its share of the
+// charts one after another; the pages work concurrently.
+// Prints a JSON report line on stdout.
+
+const fs = require("fs");
+const puppeteer = require("puppeteer");
+
+// Runs inside the browser page.
+function render_in_page(config, width, height) {
+    var target = document.getElementById("target");
+    target.innerHTML = "";
+    var canvas = document.createElement("canvas");
+    canvas.width = width;
+    canvas.height = height;
+    target.appendChild(canvas);
+    var options = config.options = config.options || {};
+    // draw synchronously at the requested size.
+    options.animation = Object.assign({}, options.animation, {duration: 0});
+    options.responsive = false;
+    var chart = new Chart(canvas.getContext("2d"), config);
+    var url = canvas.toDataURL("image/png");
+    chart.destroy();
+    return url;
+}
+
+async function main() {
+    const job = JSON.parse(fs.readFileSync(process.argv[2], "utf8"));
+    const browser = await puppeteer.launch(job.launch);
+    const queue = job.charts.map((chart, index) => Object.assign({index: index}, chart));
+    const paths = new Array(queue.length);
+    const started = Date.now();
+
+    async function worker() {
+        const page = await browser.newPage();
+        await page.setContent("<html><body><div id='target'></div></body></html>");
+        await page.addScriptTag({path: job.chart_js});
+        while (queue.length) {
+            const item = queue.shift();
+            const url = await page.evaluate(render_in_page, item.config, job.width, job.height);
+            fs.writeFileSync(item.path, Buffer.from(url.substring(url.indexOf(",") + 1), "base64"));
+            paths[item.index] = item.path;
+        }
+        await page.close();
+    }
+
+    const workers = [];
+    for (var i = 0; i < Math.min(job.pool_size, queue.length); i++) {
+        workers.push(worker());
+    }
+    await Promise.all(workers);
+    const seconds = (Date.now() - started) / 1000.0;
+    await browser.close();
+    console.log(JSON.stringify({
+        paths: paths,
+        count: paths.length,
+        pool_size: job.pool_size,
+        seconds: seconds,
+        charts_per_second: seconds > 0 ? paths.length / seconds : null,
+    }));
+}
+
+main().catch((error) => {
+    console.error(error);
+    process.exit(1);
+});
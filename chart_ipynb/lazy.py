@@ -0,0 +1,53 @@
+"""
+Deferred chart helpers: with lazy=True a *_chart helper returns a ChartSpec that only
+records the call.  The widget is created (requirements loaded, config sent) when the
+spec is displayed or render() is called, so charts built speculatively cost nothing.
+
+    specs = [bar.bar_chart(name, df, 'label', 'value', lazy=True) for (name, df) in frames]
+    specs[3]            # only this chart is built and shown
+"""
+
+import functools
+
+class ChartSpec(object):
+
+    "A *_chart helper call deferred until display or render()."
+
+    def __init__(self, helper, args, kwargs):
+        self.helper = helper
+        self.args = args
+        self.kwargs = kwargs
+        self.chart = None
+
+    @property
+    def rendered(self):
+        return self.chart is not None
+
+    def render(self):
+        "Build the chart widget (once) and return it."
+        if self.chart is None:
+            self.chart = self.helper(*self.args, **self.kwargs)
+        return self.chart
+
+    def _ipython_display_(self):
+        from IPython.display import display
+        display(self.render())
+
+    def __getattr__(self, name):
+        # Chart methods and attributes (update_data, config, ...) build the chart first.
+        if name.startswith("_") or name in ("helper", "args", "kwargs", "chart"):
+            raise AttributeError(name)
+        return getattr(self.render(), name)
+
+    def __repr__(self):
+        state = "rendered" if self.rendered else "not rendered"
+        return "ChartSpec(%s, %s)" % (self.helper.__name__, state)
+
+def deferrable(helper):
+    "Give a chart helper a lazy=False keyword; lazy=True returns a ChartSpec for the call."
+    @functools.wraps(helper)
+    def wrapper(*args, lazy=False, **kwargs):
+        if lazy:
+            return ChartSpec(helper, args, kwargs)
+        return helper(*args, **kwargs)
+    return wrapper
@@ -1,7 +1,8 @@
 from . import chart_framework
 from . import chart_setup
 from . import utils
-import pandas as pd
+from . import aggregation
+from . import lazy
 import numpy as np
 import random
 
@@ -18,22 +19,26 @@ class Pie(chart_setup.Chart_init):
         self.options = options
         self.reset()
 
-def pie_chart(title, data, label=None, value=None):
+@lazy.deferrable
+def pie_chart(title, data, label=None, value=None, agg=None, sort=True):
     '''
     data format: pd.DataFrame 
                  or
                  {'label1': 1, 'label2': 2}
                  or
                  {'label':[], 'dataset1':[],...}
+    agg: how values are aggregated per label: 'sum' (default), 'mean', 'count', 'min', 'max',
+         a quantile like 'q90', or a list of these (one dataset each)
+    value: a column name, or a list of columns for one dataset per column
+    sort: sort the labels (False keeps their first appearance order)
+    lazy: if True, return a lazy.ChartSpec that builds the chart on display or render()
     '''
     chart = Pie(title=title)
-    if isinstance(data, pd.DataFrame):
-        if (label is not None) & (value is not None):
-            data = data[[label,value]].groupby(label).sum().reset_index()
-            label = data[label].tolist()
-            value = data[value].tolist()
-            colors = [random.choice(utils.color_name) for i in label]
-        chart.add_dataset(label,value,'dataset1',color=colors)
+    if utils.is_dataframe(data):
+        label, series = aggregation.frame_datasets(data, label, value, agg=agg, sort=sort)
+        colors = [random.choice(utils.color_name) for i in label]
+        for (name, values) in series:
+            chart.add_dataset(label, values, name, color=colors)
     if isinstance(data, dict):
         if 'label' in data:
             label = data['label']
@@ -1,20 +1,165 @@
 from . import chart_framework
 from . import chart_setup
 from . import utils
-import pandas as pd
+from . import instrumentation
+from . import lazy
 import numpy as np
 
 
+# Grid index of point positions in canvas pixels answering nearest point
+# queries for clicks and tooltips without scanning every element.  It is
+# updated after every chart update: new points are inserted when points were
+# only appended and the scales did not move, otherwise it is rebuilt.
+spatial_index_js = """
+    var chart = element.chart_info.chart;
+    var size = cell_size || 24;
+    var cell_key = function (cx, cy) {
+        return (cx + 32768) * 65536 + (cy + 32768);
+    };
+    var index = {cells: new Map(), datasets: [], signature: null, max_reach: 0};
+    var scale_signature = function () {
+        var area = chart.chartArea;
+        var parts = [area.left, area.top, area.right, area.bottom, chart.data.datasets.length];
+        for (var id in chart.scales) {
+            parts.push(id, chart.scales[id].min, chart.scales[id].max);
+        }
+        for (var i = 0; i < chart.data.datasets.length; i++) {
+            parts.push(chart.isDatasetVisible(i));
+        }
+        return JSON.stringify(parts);
+    };
+    var insert = function (dataset_index, start) {
+        var elements = chart.getDatasetMeta(dataset_index).data;
+        for (var i = start; i < elements.length; i++) {
+            var model = elements[i]._model;
+            if (!model || model.skip || !isFinite(model.x) || !isFinite(model.y)) {
+                continue;
+            }
+            var key = cell_key(Math.floor(model.x / size), Math.floor(model.y / size));
+            var cell = index.cells.get(key);
+            if (!cell) {
+                cell = [];
+                index.cells.set(key, cell);
+            }
+            cell.push(dataset_index, i);
+            index.max_reach = Math.max(index.max_reach, (model.radius || 0) + (model.hitRadius || 0));
+        }
+        return elements.length;
+    };
+    index.update = function () {
+        var signature = scale_signature();
+        var datasets = chart.data.datasets;
+        var full = (signature !== index.signature);
+        for (var i = 0; !full && i < datasets.length; i++) {
+            var state = index.datasets[i];
+            var elements = chart.getDatasetMeta(i).data;
+            full = !state || state.data !== datasets[i].data || state.first !== elements[0] ||
+                elements.length < state.count;
+        }
+        if (full) {
+            index.cells = new Map();
+            index.max_reach = 0;
+            if (!cell_size) {
+                // about one point per cell on average.
+                var count = 0;
+                for (var i = 0; i < datasets.length; i++) {
+                    count += chart.isDatasetVisible(i) ? chart.getDatasetMeta(i).data.length : 0;
+                }
+                var area = chart.chartArea;
+                var pixels = Math.max(1, (area.right - area.left) * (area.bottom - area.top));
+                size = Math.max(2, Math.ceil(Math.sqrt(pixels / Math.max(1, count))));
+            }
+        }
+        var states = [];
+        for (var i = 0; i < datasets.length; i++) {
+            var start = full ? 0 : index.datasets[i].count;
+            var count = chart.isDatasetVisible(i) ? insert(i, start) : 0;
+            states.push({data: datasets[i].data, first: chart.getDatasetMeta(i).data[0], count: count});
+        }
+        index.datasets = states;
+        index.signature = signature;
+    };
+    // elements (at most one) nearest to canvas position x, y; when intersect is set
+    // only points within their radius + hitRadius count.
+    index.query = function (x, y, intersect) {
+        var max_distance = intersect ? index.max_reach : chart.width + chart.height;
+        var cx = Math.floor(x / size);
+        var cy = Math.floor(y / size);
+        var rings = Math.ceil(max_distance / size) + 1;
+        var best = null;
+        var best_distance = Infinity;
+        for (var ring = 0; ring <= rings; ring++) {
+            if (best && best_distance <= (ring - 1) * size) {
+                break;
+            }
+            for (var dx = -ring; dx <= ring; dx++) {
+                for (var dy = -ring; dy <= ring; dy++) {
+                    if (Math.max(Math.abs(dx), Math.abs(dy)) != ring) {
+                        continue;
+                    }
+                    var cell = index.cells.get(cell_key(cx + dx, cy + dy));
+                    if (!cell) {
+                        continue;
+                    }
+                    for (var k = 0; k < cell.length; k += 2) {
+                        var point = chart.getDatasetMeta(cell[k]).data[cell[k + 1]];
+                        var model = point && point._model;
+                        if (!model) {
+                            continue;
+                        }
+                        var distance = Math.sqrt((model.x - x) * (model.x - x) + (model.y - y) * (model.y - y));
+                        var reach = intersect ? (model.radius || 0) + (model.hitRadius || 0) : Infinity;
+                        if (distance <= reach && distance < best_distance) {
+                            best = point;
+                            best_distance = distance;
+                        }
+                    }
+                }
+            }
+        }
+        return best ? [best] : [];
+    };
+    chart.chart_ipynb_spatial_index = index;
+    if (!Chart.Interaction.modes.chart_ipynb_spatial) {
+        Chart.Interaction.modes.chart_ipynb_spatial = function (chart, e, options) {
+            var index = chart.chart_ipynb_spatial_index;
+            if (!index) {
+                return Chart.Interaction.modes.nearest(chart, e, options);
+            }
+            var position = e.native ? {x: e.x, y: e.y} : Chart.helpers.getRelativePosition(e, chart);
+            return index.query(position.x, position.y, options.intersect !== false);
+        };
+    }
+    element.chart_info.element_at_event = function (event) {
+        var position = Chart.helpers.getRelativePosition(event, chart);
+        return index.query(position.x, position.y, true);
+    };
+    chart.options.tooltips.mode = "chart_ipynb_spatial";
+    chart.options.hover.mode = "chart_ipynb_spatial";
+    chart.config.plugins = chart.config.plugins || [];
+    chart.config.plugins.push({afterUpdate: index.update});
+    element.chart_info.schedule_update();
+"""
+
 class Scatter(chart_setup.Chart_init):
 
     title = 'Scatter Chart'
     chart_type = 'scatter'
 
-    def __init__(self, options=None, title = None, *pargs, **kwargs):
+    # grid cell size in pixels of the spatial index (see spatial_index_js);
+    # None sizes cells for about one point each.
+    spatial_cell_size = None
+
+    def __init__(self, options=None, title = None, spatial_index = False, *pargs, **kwargs):
+        """
+        spatial_index: if True, clicks and tooltips find points through a grid index
+            instead of scanning every element (for charts with many points).
+        """
         super(Scatter, self).__init__(title = title, *pargs, **kwargs)
         if options is None:
             options = self.default_options()
         self.options = options
+        self.spatial_index = spatial_index
         self.reset()
 
     def add(self, datum, color):
@@ -51,6 +196,8 @@ class Scatter(chart_setup.Chart_init):
                         fill = fill,
                         **other_arguments,
                     )
+        if self.max_points:
+            _dataset['data'] = self.windowed(_dataset['data'])
         self.datasets.append(_dataset)
 
     def get_ready_data(self, label, backgroundColor=None, borderColor=None, fill = False, **other_arguments):
@@ -69,20 +216,46 @@ class Scatter(chart_setup.Chart_init):
                         **other_arguments,
                         )
 
-    def setup(self, width=800, **other_arguments): 
+    def setup(self, width=800, transport=None, **other_arguments): 
+        started = instrumentation.now()
         if not self.datasets:
             self.add_dataset(self.data, "My dataset", backgroundColor = self.colors)
         config = utils.config(
             type=self.chart_type,
             data=utils.data(
-                datasets=self.datasets,
+                datasets=self.plain_datasets(),
             ),
             options=self.options,
             **other_arguments,
         )
-        self.initialize_chart(width, config)
+        self.config = config
+        self.record_since("setup", "build_seconds", started)
+        self.initialize_chart(width, config, transport)
+        if self.spatial_index:
+            self.chart_js(spatial_index_js, operation="spatial_index", cell_size=self.spatial_cell_size)
     
-def scatter_chart(title, data, x=None, y=None):
+def point_data(x, y, r=None):
+    '''
+    Points for scatter and bubble charts from x, y (and bubble radius r) columns,
+    kept as utils.PointColumns: float numpy columns, with no Python object per
+    point.  The point dicts (or typed array columns with a float64 or float32
+    transport) are built only when the chart is sent.  Columns that are not
+    numeric give a plain [{'x': .., 'y': ..}, ...] list.
+    '''
+    columns = dict(x=x, y=y)
+    if r is not None:
+        columns['r'] = r
+    try:
+        return utils.PointColumns(**columns)
+    except (TypeError, ValueError):
+        pass
+    (xs, ys) = (utils.to_list(x), utils.to_list(y))
+    if r is None:
+        return [{'x': a, 'y': b} for (a, b) in zip(xs, ys)]
+    return [{'x': a, 'y': b, 'r': c} for (a, b, c) in zip(xs, ys, utils.to_list(r))]
+
+@lazy.deferrable
+def scatter_chart(title, data, x=None, y=None, spatial_index=False):
     '''
     data format: pd.DataFrame 
                  or
@@ -92,31 +265,19 @@ def scatter_chart(title, data, x=None, y=None):
                  or 
                  {'dataset1':[{'x':1,'y':2},...],
                   'dataset2':.....}
+    spatial_index: use a grid index for clicks and tooltips (for many points)
+    lazy: if True, return a lazy.ChartSpec that builds the chart on display or render()
     '''
-    chart = Scatter(title=title)
-    if isinstance(data, pd.DataFrame):
-        if x is not None:
-            x = data[x].tolist()
-        if y is not None:
-            y = data[y].tolist()
-        dataset = []
-        for i in range(len(x)):
-            d = {'x':x[i],'y':y[i]}
-            dataset.append(d)
-        chart.add_dataset(dataset,'dataset1')
+    chart = Scatter(title=title, spatial_index=spatial_index)
+    if utils.is_dataframe(data):
+        chart.add_dataset(point_data(data[x].values, data[y].values), 'dataset1')
     if isinstance(data, dict):
         if 'x' in data:
-            x = data['x']
-            y = data['y']
-            dataset = []
-            for i in range(len(x)):
-                d = {'x':x[i],'y':y[i]}
-                dataset.append(d)
-            chart.add_dataset(dataset,'dataset1')
+            chart.add_dataset(point_data(data['x'], data['y']), 'dataset1')
         else:
             for name in data:
                 chart.add_dataset(data[name], name)
     if isinstance(data,list):
         chart.add_dataset(data, 'dataset1')
     chart.setup()
-    return chart
\ No newline at end of file
+    return chart
@@ -1,45 +1,107 @@
 from . import chart_framework
 from . import chart_setup
 from . import utils, line, bar
-import pandas as pd
+from . import lazy
 import numpy as np
-import pandas_datareader
-import pandas_datareader.data as web
 import datetime
 import time
 import random
 
 
 
-global_label = None
-
 def data_format(dataset, val_col, data_provide = False, date_col=None):
         """
         dataset: pd.DataFrame
         val_col: the column name for the target value. e.g 'Close'
         """
-        global global_label
         if not data_provide:
             date_col = 'Date'
         else:
             if date_col is None:
                 print('please specify the date column')
                 raise
+        if date_col not in dataset.columns and dataset.index.name == date_col:
+            # DataReader results are indexed by date.
+            dataset = dataset.reset_index()
         idx_reset_df = dataset.reset_index(drop=True)
-        data = idx_reset_df[[val_col, date_col]]
         sort_df = idx_reset_df.sort_values(by=date_col)
-        sort_df[date_col]=sort_df[date_col].astype(str)
         val_data = list(sort_df[val_col])
-        label_data = list(sort_df[date_col])
-        if data_provide:
-            if global_label is None:
-                global_label = label_data[:]
-            else:
-                if len(global_label) > len(label_data):
-                    val_data = [0]*(len(global_label)-len(label_data)) + val_data
-                    label_data = global_label[:]
+        label_data = list(sort_df[date_col].astype(str))
         return  val_data, label_data
 
+fill_policies = ('zero', 'null', 'ffill')
+
+def align_series(series, missing = 'zero'):
+        """
+        Outer join (values, labels) pairs (as returned by data_format) on their date labels.
+        missing: how a date absent from a series is filled:
+            'zero', 'null' (None, a gap in the chart) or 'ffill' (the previous value; None before the first)
+        Return the sorted union of the labels and one value list per series.
+        """
+        if missing not in fill_policies:
+            print('missing should be one of %s' % (fill_policies,))
+            raise ValueError(missing)
+        import pandas as pd
+        columns = []
+        for (i, (values, labels)) in enumerate(series):
+            column = pd.Series(list(values), index=[str(label) for label in labels], name=i)
+            columns.append(column[~column.index.duplicated(keep='last')])
+        if not columns:
+            return [], []
+        frame = pd.concat(columns, axis=1, join='outer')
+        try:
+            order = pd.to_datetime(frame.index)
+        except (ValueError, TypeError):
+            order = frame.index
+        frame = frame.iloc[np.argsort(np.asarray(order), kind='stable')]
+        if missing == 'zero':
+            frame = frame.fillna(0)
+        elif missing == 'ffill':
+            frame = frame.ffill()
+        aligned = []
+        for name in frame.columns:
+            values = frame[name].to_numpy(dtype=object)
+            values[pd.isna(frame[name]).to_numpy()] = None
+            aligned.append(values.tolist())
+        return list(frame.index), aligned
+
+def fetch_datasets(symbols, reader, max_workers = 8, retries = 2, retry_delay = 0.5):
+        """
+        Call reader(symbol) for every symbol on a bounded thread pool.
+        A failing symbol is retried alone up to `retries` more times.
+        Return the results in the order of symbols and a timing record per symbol:
+        {'symbol', 'seconds' (of the successful attempt), 'total_seconds', 'attempts'}.
+        """
+        def fetch(symbol):
+            started = time.perf_counter()
+            attempt = 0
+            while True:
+                attempt += 1
+                attempt_started = time.perf_counter()
+                try:
+                    dataset = reader(symbol)
+                except Exception:
+                    if attempt > retries:
+                        print('fetching %s failed after %s attempts' % (symbol, attempt))
+                        raise
+                    time.sleep(retry_delay * attempt * (1 + random.random()))
+                    continue
+                finished = time.perf_counter()
+                timing = {'symbol': symbol,
+                          'seconds': finished - attempt_started,
+                          'total_seconds': finished - started,
+                          'attempts': attempt}
+                return dataset, timing
+        if max_workers is None or max_workers > len(symbols):
+            max_workers = len(symbols)
+        if max_workers <= 1:
+            fetched = [fetch(symbol) for symbol in symbols]
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers = max_workers) as pool:
+                fetched = list(pool.map(fetch, symbols))
+        return [dataset for (dataset, _) in fetched], [timing for (_, timing) in fetched]
+
 def default_axis(axis, axis_label = None, multi_axis = False, multi_axis_name = None, stacked = False):
         axis_labels = {'x': 'x', 'y': 'y'}
         if axis_label is None:
@@ -146,6 +208,7 @@ def ts_default_option(xAxes = None, yAxes = None,
             _option['scales']['yAxes'][0].update({'type':'logarithmic'})
         return _option
 
+@lazy.deferrable
 def time_series_Chart(_chart_type, ticker_symbol, val_col, date_col = None, start=None, end=None, 
                             data_provide = False, input_dataset = None,
                             website = None, api_key = None, 
@@ -156,6 +219,8 @@ def time_series_Chart(_chart_type, ticker_symbol, val_col, date_col = None, star
                             fill = False, log_axis = False,
                             mode = 'index', intersect = False,
                             width=800,
+                            max_points_per_dataset = None, decimate = False,
+                            cache = None, max_workers = 8, retries = 2, missing = 'zero',
                             **other_arguments
                     ):
     '''
@@ -181,10 +246,15 @@ def time_series_Chart(_chart_type, ticker_symbol, val_col, date_col = None, star
     title: title of the chart  
     fill: fill the point or not  
     width: width of the chart  
+    max_points_per_dataset: if set, downsample long series (LTTB) to about this many points  
+    decimate: if True, keep only the min and max of each pixel wide bucket (suits bar charts)  
+    cache: a data_cache.DataCache (or True for the shared on disk cache) to reuse downloaded data  
+    max_workers: how many symbols are fetched at the same time  
+    retries: how many more times a symbol that failed to download is fetched again  
+    missing: how dates missing from one of the datasets are filled: 'zero', 'null' or 'ffill'  
     **other_arguments: refer to Chart.js
+    lazy: if True, return a lazy.ChartSpec that builds the chart on display or render()  
     '''
-    global global_label
-
     if not data_provide:   
         if website == 'quandl' and api_key is None:
             api_key = '1JFowowyzc-FnajAsDkY' # noqa
@@ -231,19 +301,36 @@ def time_series_Chart(_chart_type, ticker_symbol, val_col, date_col = None, star
     if _chart_type == 'bar':
         result = bar.Bar(options = options, stacked=stacked, title=title)
 
+    if cache is True:
+        from . import data_cache
+        cache = data_cache.shared_cache()
+
     if data_provide:
-        global_label = list(input_dataset[np.argmax([input_dataset[i].shape[0] for i in range(len(input_dataset))])][date_col].values)
+        result.fetch_timings = []
+    else:
+        def reader(symbol):
+            if cache is not None:
+                return cache.get(symbol, website, start, end, api_key = api_key)
+            import pandas_datareader.data as web
+            return web.DataReader(symbol, website, start, end, api_key = api_key)
+        fetched, result.fetch_timings = fetch_datasets(ticker_symbol, reader,
+                                                       max_workers = max_workers, retries = retries)
 
+    series = []
     for i in range(len(ticker_symbol)):
-            symbol = ticker_symbol[i]
             _dataset = None
             if not data_provide:
-                _dataset = web.DataReader(symbol, website, start, end, api_key = api_key)
+                _dataset = fetched[i]
             else:
                 _dataset = input_dataset[i]
-            _data, result.labels = data_format(_dataset, val_col, 
-                                                data_provide = data_provide, 
-                                                date_col=date_col)
+            series.append(data_format(_dataset, val_col, 
+                                      data_provide = data_provide, 
+                                      date_col=date_col))
+    result.labels, aligned = align_series(series, missing = missing)
+
+    for i in range(len(ticker_symbol)):
+            symbol = ticker_symbol[i]
+            _data = aligned[i]
             if multi_axis:
                 result.add_dataset(result.labels, _data, symbol, color = colors[i],
                                     backgroundColor = backgroundColor[i], 
@@ -268,6 +355,10 @@ def time_series_Chart(_chart_type, ticker_symbol, val_col, date_col = None, star
                                         pointRadius = 0,
                                         lineTension = 0,
                                         borderWidth = 1)
+    if max_points_per_dataset is not None:
+        result.downsample(max_points_per_dataset)
+    if decimate:
+        result.decimate(width)
     result.setup(width, **other_arguments) 
 
     return result
\ No newline at end of file
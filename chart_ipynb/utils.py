@@ -1,5 +1,10 @@
 
 import numpy as np
+import base64
+import datetime
+import json
+import math
+import sys
 
 def clean_dict(**kwargs):
     "Like dict but with no None values make some values JSON serializable"
@@ -18,6 +23,456 @@ def clean_dict(**kwargs):
             result[kw] = v
     return result
 
+def to_list(values):
+    "Plain list from a list, tuple, numpy array or other iterable (None gives [])."
+    if values is None:
+        return []
+    if isinstance(values, np.ndarray):
+        return values.tolist()
+    if hasattr(values, "tolist"):
+        # pandas Series and Index
+        return values.tolist()
+    return list(values)
+
+def is_dataframe(value):
+    "True for a pandas DataFrame, without importing pandas (it is loaded if one exists)."
+    pd = sys.modules.get("pandas")
+    return pd is not None and isinstance(value, pd.DataFrame)
+
+class IndexedList(list):
+    """
+    A list that keeps a hashed value -> first index map so that `in` and index()
+    are O(1).  Appending and popping from either end keep the map current (pops
+    from the front shift an offset instead of every position); other mutations
+    drop it and it is rebuilt on the next lookup.  Unhashable values fall back to
+    plain list scans.
+    """
+
+    def __init__(self, values=()):
+        list.__init__(self, values)
+        self._invalidate()
+
+    def _index_map(self):
+        positions = self._positions
+        if positions is None:
+            positions = {}
+            counts = {}
+            try:
+                for (i, value) in enumerate(self):
+                    positions.setdefault(value, i)
+                    counts[value] = counts.get(value, 0) + 1
+            except TypeError:
+                positions = counts = False
+            self._positions = positions
+            self._counts = counts
+            self._offset = 0
+        return positions
+
+    def _invalidate(self):
+        # positions hold index + _offset; counts how often each value occurs.
+        self._positions = None
+        self._counts = None
+        self._offset = 0
+
+    def append(self, value):
+        list.append(self, value)
+        positions = self._positions
+        if isinstance(positions, dict):
+            try:
+                positions.setdefault(value, len(self) - 1 + self._offset)
+                self._counts[value] = self._counts.get(value, 0) + 1
+            except TypeError:
+                self._positions = self._counts = False
+
+    def extend(self, values):
+        for value in values:
+            self.append(value)
+
+    def pop(self, index=-1):
+        length = len(self)
+        value = list.pop(self, index)
+        positions = self._positions
+        if not isinstance(positions, dict):
+            self._invalidate()
+        elif index in (0, -length):
+            self._offset += 1
+            self._forget(value, lambda: list.index(self, value) + self._offset)
+        elif index in (-1, length - 1):
+            self._forget(value, lambda: positions[value])
+        else:
+            self._invalidate()
+        return value
+
+    def _forget(self, value, first_position):
+        "Update the map for one removed occurrence of value; first_position() gives its new first index."
+        counts = self._counts
+        counts[value] -= 1
+        if counts[value]:
+            self._positions[value] = first_position()
+        else:
+            del counts[value]
+            del self._positions[value]
+
+    def __contains__(self, value):
+        positions = self._index_map()
+        if positions is not False:
+            try:
+                return value in positions
+            except TypeError:
+                pass
+        return list.__contains__(self, value)
+
+    def index(self, value, *bounds):
+        positions = self._index_map()
+        if positions is not False and not bounds:
+            try:
+                return positions[value] - self._offset
+            except KeyError:
+                raise ValueError("%r is not in list" % (value,))
+            except TypeError:
+                pass
+        return list.index(self, value, *bounds)
+
+    def _mutator(name):
+        method = getattr(list, name)
+        def mutate(self, *args, **kwargs):
+            self._invalidate()
+            return method(self, *args, **kwargs)
+        mutate.__name__ = name
+        return mutate
+
+    insert = _mutator("insert")
+    remove = _mutator("remove")
+    clear = _mutator("clear")
+    sort = _mutator("sort")
+    reverse = _mutator("reverse")
+    __setitem__ = _mutator("__setitem__")
+    __delitem__ = _mutator("__delitem__")
+    __iadd__ = _mutator("__iadd__")
+    __imul__ = _mutator("__imul__")
+    del _mutator
+
+def indexed_list(values):
+    "values as an IndexedList, without copying values that already are one."
+    if isinstance(values, IndexedList):
+        return values
+    return IndexedList(values)
+
+class RingBuffer(object):
+    """
+    Fixed capacity sequence backed by a preallocated numpy array.  Appending to a
+    full buffer evicts the oldest value in O(1).  Float buffers store None as NaN.
+    With indexed=True `in` and index() are O(1) (index() gives the newest match).
+    """
+
+    def __init__(self, capacity, dtype=float, values=(), indexed=False):
+        assert capacity > 0, "capacity must be positive " + repr(capacity)
+        self.capacity = capacity
+        self.array = np.empty(capacity, dtype=dtype)
+        self.start = 0
+        self.size = 0
+        # number of values ever appended: absolute position of the next value
+        self.appended = 0
+        self.positions = {} if indexed else None
+        self.extend(values)
+
+    def __len__(self):
+        return self.size
+
+    def _slot(self, index):
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("ring buffer index out of range")
+        return (self.start + index) % self.capacity
+
+    def append(self, value):
+        "Add value at the end, evicting the oldest value if full.  Return True if a value was evicted."
+        capacity = self.capacity
+        evicted = self.size == capacity
+        positions = self.positions
+        if evicted:
+            slot = self.start
+            if positions is not None:
+                old = self.array[slot]
+                if positions.get(old) == self.appended - capacity:
+                    del positions[old]
+            self.start = (slot + 1) % capacity
+        else:
+            slot = (self.start + self.size) % capacity
+            self.size += 1
+        self.array[slot] = value
+        if positions is not None:
+            positions[value] = self.appended
+        self.appended += 1
+        return evicted
+
+    def extend(self, values):
+        if self.positions is not None or self.array.dtype == object:
+            for value in values:
+                self.append(value)
+            return
+        values = np.asarray(values, dtype=self.array.dtype)
+        n = len(values)
+        capacity = self.capacity
+        if n >= capacity:
+            self.array[:] = values[n - capacity:]
+            self.start = 0
+            self.size = capacity
+        elif n:
+            write = (self.start + self.size) % capacity
+            first = min(n, capacity - write)
+            self.array[write:write + first] = values[:first]
+            self.array[:n - first] = values[first:]
+            overflow = max(0, self.size + n - capacity)
+            self.start = (self.start + overflow) % capacity
+            self.size = min(capacity, self.size + n)
+        self.appended += n
+
+    def to_array(self):
+        "The values, oldest first, as a new numpy array."
+        end = self.start + self.size
+        if end <= self.capacity:
+            return self.array[self.start:end].copy()
+        return np.concatenate((self.array[self.start:], self.array[:end - self.capacity]))
+
+    def tolist(self):
+        values = self.to_array()
+        if values.dtype.kind == "f":
+            return [None if v != v else v for v in values.tolist()]
+        return values.tolist()
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.tolist()[index]
+        value = self.array[self._slot(index)]
+        if isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, float) and value != value:
+            return None
+        return value
+
+    def __setitem__(self, index, value):
+        slot = self._slot(index)
+        positions = self.positions
+        if positions is not None:
+            # absolute position of the slot; only the old and new value's entries change.
+            position = self.appended - self.size + (slot - self.start) % self.capacity
+            old = self.array[slot]
+            self.array[slot] = value
+            if positions.get(old) == position and old != value:
+                del positions[old]
+                for i in range(self.size - 1, -1, -1):
+                    if self.array[(self.start + i) % self.capacity] == old:
+                        positions[old] = self.appended - self.size + i
+                        break
+            if positions.get(value, -1) < position:
+                positions[value] = position
+        else:
+            self.array[slot] = np.nan if value is None and self.array.dtype.kind == "f" else value
+
+    def __contains__(self, value):
+        if self.positions is not None:
+            try:
+                return value in self.positions
+            except TypeError:
+                return False
+        return value in self.tolist()
+
+    def index(self, value):
+        if self.positions is not None:
+            try:
+                return self.positions[value] - (self.appended - self.size)
+            except (KeyError, TypeError):
+                raise ValueError("%r is not in ring buffer" % (value,))
+        return self.tolist().index(value)
+
+    def pop(self, index=-1):
+        "Remove and return the value at index (O(n) except at the end)."
+        values = self.tolist()
+        value = values.pop(index)
+        self._reset(values)
+        return value
+
+    def _reset(self, values):
+        self.start = 0
+        self.size = 0
+        if self.positions is not None:
+            self.positions = {}
+        self.extend(values)
+
+    def __eq__(self, other):
+        return self.tolist() == list(other)
+
+    def __repr__(self):
+        return "RingBuffer(%s, %r)" % (self.capacity, self.tolist())
+
+def float_column(values):
+    "values as a new float64 numpy array (None becomes NaN); TypeError if they are not numeric."
+    array = np.asarray(values)
+    if array.dtype.kind not in "biufO":
+        raise TypeError("point columns must be numeric, not %s" % array.dtype)
+    return array.astype(float)
+
+class PointColumns(object):
+    """
+    Scatter and bubble points kept as float numpy columns (x, y and r) instead of
+    one dict per point.  Items read back as {'x': .., 'y': ..} dicts (None for a
+    point set to None); pack_data sends the columns as typed arrays, and tolist()
+    or json_safe build the point dicts only when they are sent.  With a capacity
+    (window mode) appending beyond it drops the oldest points.
+    """
+
+    def __init__(self, capacity=None, **columns):
+        self.capacity = capacity
+        self.names = list(columns.keys())
+        self.arrays = dict((name, float_column(columns[name])) for name in self.names)
+        lengths = set(len(array) for array in self.arrays.values())
+        if len(lengths) > 1:
+            raise ValueError("point columns must have the same length")
+        self.start = 0
+        self.size = lengths.pop() if lengths else 0
+        self._trim()
+
+    @classmethod
+    def from_points(cls, points, names=None, capacity=None):
+        "PointColumns of a sequence of point dicts (or None), or of another PointColumns."
+        if isinstance(points, PointColumns):
+            columns = dict((name, points.column(name)) for name in points.names)
+            return cls(capacity, **columns)
+        points = to_list(points)
+        if names is None:
+            first = next((point for point in points if point is not None), {})
+            names = list(first.keys())
+        columns = dict(
+            (name, [None if point is None else point.get(name) for point in points])
+            for name in names
+        )
+        return cls(capacity, **columns)
+
+    def __len__(self):
+        return self.size
+
+    def column(self, name):
+        "The values of one column as a numpy view (NaN for missing values)."
+        return self.arrays[name][self.start:self.start + self.size]
+
+    def _slot(self, index):
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("point index out of range")
+        return self.start + index
+
+    def _reserve(self, n):
+        "Make room for n more points after the current ones."
+        length = len(self.arrays[self.names[0]]) if self.names else 0
+        if self.start + self.size + n <= length:
+            return
+        # doubling keeps appends amortized O(1); the dropped front is reclaimed here.
+        length = max(16, 2 * (self.size + n))
+        for name in self.names:
+            array = np.empty(length)
+            array[:self.size] = self.column(name)
+            self.arrays[name] = array
+        self.start = 0
+
+    def _trim(self):
+        if self.capacity and self.size > self.capacity:
+            self.start += self.size - self.capacity
+            self.size = self.capacity
+
+    def append(self, point):
+        self._reserve(1)
+        self.size += 1
+        self[self.size - 1] = point
+        self._trim()
+
+    def extend(self, points):
+        points = PointColumns.from_points(points, self.names)
+        n = len(points)
+        self._reserve(n)
+        end = self.start + self.size
+        for name in self.names:
+            self.arrays[name][end:end + n] = points.column(name)
+        self.size += n
+        self._trim()
+
+    def windowed(self, capacity):
+        "These points, or a copy of the newest capacity of them keeping only capacity (None: no limit)."
+        if capacity == self.capacity:
+            return self
+        columns = dict((name, self.column(name)) for name in self.names)
+        return PointColumns(capacity, **columns)
+
+    def packed(self, dtype="float64"):
+        "The typed_columns encoding of the points."
+        return typed_columns(dtype, **dict((name, self.column(name)) for name in self.names))
+
+    def tolist(self):
+        "The points as JSON ready dicts: NaN/inf values become None, all NaN points None."
+        columns = [self.column(name) for name in self.names]
+        values = [column.tolist() for column in columns]
+        names = tuple(self.names)
+        if names == ("x", "y"):
+            points = [{"x": x, "y": y} for (x, y) in zip(*values)]
+        elif names == ("x", "y", "r"):
+            points = [{"x": x, "y": y, "r": r} for (x, y, r) in zip(*values)]
+        else:
+            points = [dict(zip(names, point)) for point in zip(*values)]
+        if not columns or all(np.isfinite(column).all() for column in columns):
+            return points
+        stacked = np.vstack(columns)
+        bad = ~np.isfinite(stacked)
+        removed = np.isnan(stacked).all(axis=0)
+        for i in np.flatnonzero(bad.any(axis=0)).tolist():
+            if removed[i]:
+                points[i] = None
+            else:
+                points[i] = dict((name, None if bad[j, i] else points[i][name]) for (j, name) in enumerate(names))
+        return points
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.tolist()[index]
+        slot = self._slot(index)
+        values = [float(self.arrays[name][slot]) for name in self.names]
+        if all(value != value for value in values):
+            return None
+        return dict((name, None if value != value else value) for (name, value) in zip(self.names, values))
+
+    def __setitem__(self, index, point):
+        slot = self._slot(index)
+        for name in self.names:
+            value = None if point is None else point.get(name)
+            self.arrays[name][slot] = np.nan if value is None else value
+
+    def pop(self, index=-1):
+        "Remove and return the point at index (O(n) except at either end)."
+        point = self[index]
+        slot = self._slot(index)
+        end = self.start + self.size
+        if slot == self.start:
+            self.start += 1
+        elif slot < end - 1:
+            for name in self.names:
+                array = self.arrays[name]
+                array[slot:end - 1] = array[slot + 1:end]
+        self.size -= 1
+        return point
+
+    def __eq__(self, other):
+        return self.tolist() == list(other)
+
+    def __repr__(self):
+        return "PointColumns(%s, %d points)" % (", ".join(self.names), self.size)
+
 def options(
         responsive=True,
         legend=None,
@@ -96,6 +551,245 @@ def axes(
         **other_arguments,
     )
 
+# Binary transport for numeric arrays: values are sent as base64 encoded
+# little endian typed array buffers and rebuilt into arrays on the Javascript side.
+typed_array_types = {
+    "float64": ("<f8", "Float64Array"),
+    "float32": ("<f4", "Float32Array"),
+}
+
+def typed_array(values, dtype="float64"):
+    "Encode a numeric sequence as a base64 typed array buffer (None/NaN become null)."
+    (np_type, js_type) = typed_array_types[dtype]
+    array = np.ascontiguousarray(values, dtype=np_type)
+    return dict(
+        typed_array=js_type,
+        length=len(array),
+        buffer=base64.b64encode(array.tobytes()).decode("ascii"),
+    )
+
+def typed_columns(dtype="float64", **columns):
+    "Encode point columns like x=[...], y=[...] as typed arrays, rebuilt as [{x:.., y:..}, ...]."
+    return dict(
+        typed_columns=dict((name, typed_array(columns[name], dtype)) for name in columns),
+    )
+
+def is_typed(data):
+    return isinstance(data, dict) and ("typed_array" in data or "typed_columns" in data)
+
+def pack_data(data, dtype="float64"):
+    "Return the typed encoding of a dataset data list, or data itself if it is not numeric."
+    if isinstance(data, PointColumns):
+        return data.packed(dtype) if len(data) else data.tolist()
+    if is_typed(data) or not isinstance(data, (list, np.ndarray)) or len(data) == 0:
+        return data
+    first = data[0]
+    if isinstance(first, dict):
+        names = list(first.keys())
+        if not set(names) <= set(["x", "y", "r"]):
+            return data
+        try:
+            columns = dict((name, [point[name] for point in data]) for name in names)
+            return typed_columns(dtype, **columns)
+        except (KeyError, TypeError, ValueError):
+            return data
+    if isinstance(data, np.ndarray):
+        if data.dtype.kind not in "biuf":
+            return data
+    elif isinstance(first, str):
+        return data
+    try:
+        # None values map to NaN, which the Javascript side turns back into null.
+        return typed_array(data, dtype)
+    except (TypeError, ValueError):
+        return data
+
+def pack_config(config, dtype="float64"):
+    "Copy of config with numeric dataset data packed as typed arrays (other content is shared)."
+    data = config.get("data")
+    if not data or not data.get("datasets"):
+        return config
+    datasets = [
+        dict(dataset, data=pack_data(dataset.get("data"), dtype))
+        if isinstance(dataset, dict) and "data" in dataset else dataset
+        for dataset in data["datasets"]
+    ]
+    return dict(config, data=dict(data, datasets=datasets))
+
+def unpack_data(data):
+    "Decode a typed encoding back into the plain JSON list form."
+    if not is_typed(data):
+        return data
+    if "typed_array" in data:
+        js_names = dict((js_type, np_type) for (np_type, js_type) in typed_array_types.values())
+        array = np.frombuffer(base64.b64decode(data["buffer"]), dtype=js_names[data["typed_array"]])
+        return [None if np.isnan(v) else v for v in array.tolist()]
+    columns = dict((name, unpack_data(data["typed_columns"][name])) for name in data["typed_columns"])
+    names = list(columns.keys())
+    length = len(columns[names[0]]) if names else 0
+    return [dict((name, columns[name][i]) for name in names) for i in range(length)]
+
+def unpack_item(data, index):
+    """
+    Element index of a typed encoding, decoding only the base64 characters that hold it
+    (constant time, whatever the length).  Raises IndexError when out of range.
+    """
+    if "typed_columns" in data:
+        columns = data["typed_columns"]
+        return dict((name, unpack_item(columns[name], index)) for name in columns)
+    js_names = dict((js_type, np_type) for (np_type, js_type) in typed_array_types.values())
+    dtype = np.dtype(js_names[data["typed_array"]])
+    length = len(data["buffer"]) * 3 // 4 // dtype.itemsize
+    if index < 0:
+        index += length
+    if not 0 <= index < length:
+        raise IndexError("typed array index out of range")
+    # each 4 base64 characters encode 3 bytes.
+    start = index * dtype.itemsize
+    first = start // 3
+    encoded = data["buffer"][first * 4:((start + dtype.itemsize + 2) // 3) * 4]
+    raw = base64.b64decode(encoded)[start - first * 3:][:dtype.itemsize]
+    value = np.frombuffer(raw, dtype=dtype)[0].item()
+    return None if value != value else value
+
+def unpack_config(config):
+    "Inverse of pack_config."
+    data = config.get("data")
+    if not data or not data.get("datasets"):
+        return config
+    datasets = [
+        dict(dataset, data=unpack_data(dataset.get("data")))
+        if isinstance(dataset, dict) and "data" in dataset else dataset
+        for dataset in data["datasets"]
+    ]
+    return dict(config, data=dict(data, datasets=datasets))
+
+plain_types = (str, int, bool, type(None))
+
+def json_safe(value):
+    """
+    A chart config (or any value) with only JSON types: numpy arrays and
+    scalars, pandas objects, datetimes, RingBuffers and PointColumns are converted
+    at any depth, and NaN/inf become None (null).
+    """
+    kind = type(value)
+    if kind in plain_types:
+        return value
+    if kind is float:
+        return value if math.isfinite(value) else None
+    if kind is dict:
+        if plain_dict(value):
+            return dict(value)
+        return {json_key(k): json_safe(v) for (k, v) in value.items()}
+    if kind is list or kind is tuple:
+        return json_safe_list(value)
+    if isinstance(value, np.ndarray):
+        return json_safe_array(value)
+    if isinstance(value, np.generic):
+        if isinstance(value, (np.datetime64, np.timedelta64)):
+            return json_safe_array(np.array([value]))[0]
+        return json_safe(value.item())
+    if isinstance(value, (datetime.date, datetime.time)):
+        if value != value:
+            # pandas.NaT
+            return None
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {json_key(k): json_safe(v) for (k, v) in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return json_safe_list(list(value))
+    if isinstance(value, RingBuffer):
+        return json_safe_list(value.tolist())
+    if isinstance(value, PointColumns):
+        return value.tolist()
+    pd = sys.modules.get("pandas")
+    if pd is not None:
+        if isinstance(value, pd.DataFrame):
+            return json_safe(value.to_dict("list"))
+        if isinstance(value, (pd.Series, pd.Index)):
+            return json_safe_array(value.to_numpy())
+        if value is pd.NaT or value is pd.NA:
+            return None
+    if isinstance(value, float):
+        return json_safe(float(value))
+    if isinstance(value, str):
+        return str(value)
+    if isinstance(value, int):
+        return int(value)
+    if hasattr(value, "tolist"):
+        return json_safe(value.tolist())
+    return value
+
+def plain_dict(value):
+    "True for a dict (like a scatter point) of str keys and finite float, int, str, bool or None values."
+    for (k, v) in value.items():
+        kind = type(v)
+        if kind is float:
+            if v - v != 0:
+                return False
+        elif kind not in plain_types or type(k) is not str:
+            return False
+    return True
+
+def json_key(key):
+    if type(key) is str:
+        return key
+    key = json_safe(key)
+    return key if isinstance(key, str) else json.dumps(key)
+
+def json_safe_list(values):
+    kinds = set(map(type, values))
+    if kinds <= {int, str, bool, type(None)}:
+        return list(values)
+    if kinds <= {float, int, bool, type(None)}:
+        if type(None) in kinds:
+            finite = all(math.isfinite(v) for v in values if v is not None)
+        else:
+            finite = all(map(math.isfinite, values))
+        if finite:
+            return list(values)
+        return [None if (type(v) is float and not math.isfinite(v)) else v for v in values]
+    if kinds == {dict}:
+        # scatter/bubble points: plain ones are shared rather than copied.
+        return [v if plain_dict(v) else json_safe(v) for v in values]
+    return [json_safe(v) for v in values]
+
+def json_safe_array(array):
+    "Nested lists for a numpy array, NaN/inf/NaT as None and datetimes as ISO strings."
+    kind = array.dtype.kind
+    if kind in "biu":
+        return array.tolist()
+    if kind in "fc":
+        finite = np.isfinite(array)
+        if finite.all():
+            return array.tolist()
+        values = array.astype(object)
+        values[~finite] = None
+        return values.tolist()
+    if kind == "M":
+        missing = np.isnat(array)
+        values = np.datetime_as_string(array, unit="auto").astype(object)
+        values[missing] = None
+        return values.tolist()
+    if kind == "m":
+        missing = np.isnat(array)
+        values = (array / np.timedelta64(1, "s")).astype(object)
+        values[missing] = None
+        return values.tolist()
+    if kind in "SU":
+        return array.astype(str).tolist()
+    return json_safe_list(array.tolist()) if array.ndim == 1 else [json_safe_array(row) for row in array]
+
+def dumps(value):
+    "JSON text for a chart config (see json_safe), encoded by orjson when it is installed."
+    try:
+        import orjson
+    except ImportError:
+        return json.dumps(json_safe(value), allow_nan=False)
+    # orjson walks plain containers in C (NaN/inf become null) and calls json_safe
+    # only for the types it does not know (numpy, pandas, RingBuffer ...).
+    return orjson.dumps(value, default=json_safe, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
 color_name = ['aliceblue', 'antiquewhite', 'aqua', 
     'aquamarine', 'azure', 'beige', 'bisque', 
     'black', 'blanchedalmond', 'blue', 'blueviolet', 
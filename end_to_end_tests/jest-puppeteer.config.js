@@ -6,6 +6,9 @@ module.exports = {
         slowMo: process.env.SLOWMO ? process.env.SLOWMO : 0,
         devtools: true,
         timeout: 3000000, //  5 minute timeout
-        args: ["--no-sandbox"],   // don't use a sandbox
+        args: ["--no-sandbox"].concat(   // don't use a sandbox
+            // benchmark mode: precise performance.memory values and window.gc()
+            process.env.CHART_BENCHMARK ? ["--enable-precise-memory-info", "--js-flags=--expose-gc"] : []
+        ),
     },
 }
\ No newline at end of file
@@ -0,0 +1,178 @@
+// Helpers for driving a live Jupyter notebook page, shared by the headless and benchmark tests.
+
+const fs = require("fs");
+
+function sleep(time) {
+    return new Promise(function(resolve) { 
+        setTimeout(resolve, time)
+    });
+};
+
+function jupyter_start_url() {
+    // returns a string like http://localhost:3000/?token=0d1715cefedcff36352180eaeaf1a28d0a01728b7531c45d
+    return fs.readFileSync('./_jupyter_url.txt', 'utf8')
+};
+
+function jupyter_sub_url(path) {
+    // get a path to a notebook using path='notebooks/notebook_tests/example.ipynb'
+    var basic_url = jupyter_start_url();
+    return basic_url.replace("?", path + "?");
+};
+
+async function jupyter_live_page(browser, path, log_network = true) {
+    // get a page for a notebook using path='notebooks/notebook_tests/example.ipynb'
+    var sub_url = jupyter_sub_url(path);
+    const page = await browser.newPage();
+    // wait for the page to initialize...
+    await page.goto(sub_url, {waitUntil: 'networkidle2'});
+    await page.waitForFunction(async () => !!(document.title));
+    // https://stackoverflow.com/questions/47539043/how-to-get-all-console-messages-with-puppeteer-including-errors-csp-violations
+    page
+        .on('console', message =>
+            console.log(`${message.type().substr(0, 3).toUpperCase()} ${message.text()}`))
+        .on('pageerror', ({ message }) => console.log(message))
+    if (log_network) {
+        page
+            .on('response', response =>
+                console.log(`${response.status()} ${response.url()}`))
+            .on('requestfailed', request =>
+                console.log(`${request.failure().errorText} ${request.url()}`))
+    }
+    return page;
+};
+
+async function wait_until_there(page, selector, substring) {
+    // keep looking until timeout
+    var found = false;
+    while (!found) {
+        console.log("looking in " + selector + " for " + substring);
+        found = await substring_exists(page, selector, substring);
+        if (!found) {
+            await sleep(1000)
+        }
+    }
+};
+
+async function wait_until_gone(page, selector, substring) {
+    // keep looking until timeout
+    var found = true;
+    while (found) {
+        console.log("looking in " + selector + " for absense of " + substring);
+        found = await substring_exists(page, selector, substring);
+        if (found) {
+            await sleep(1000)
+        }
+    }
+};
+
+async function substring_exists(page, selector, substring) {
+    var match_exists = await page.evaluate((selector) => !!document.querySelector(selector), selector);
+    if (!match_exists) {
+        console.log("no match for selector " + selector)
+        return false;  // no selector match, no text match
+    }
+    var texts = await page.$$eval(
+        selector,
+        (elements) => elements.map((el) => el.textContent),
+    );
+    var text_found = false;
+    console.log("   looking for " + substring + " in " + texts.length);
+    for (var i=0; i<texts.length; i++) {
+        if (texts[i].includes(substring)) {
+            text_found = true;
+            console.log("   found " + substring + " at index " + i);
+        }
+    }
+    return text_found;
+};
+
+async function substring_exists2(page, selector, substring) {
+    var match_exists = await page.evaluate((selector) => !!document.querySelector(selector), selector);
+    if (!match_exists) {
+        console.log("no match for selector " + selector)
+        return false;  // no selector match, no text match
+    }
+    var text_found = await page.$$eval(
+        selector,
+        (elements, substring) => elements.map((el) => el.textContent.includes(substring)),
+        substring
+    );
+    return text_found;
+};
+
+async function find_and_click(page, selector, wait_to_disappear) {
+    // wait til the element exists
+    await page.waitFor(250);
+    console.log("awaiting selector ", selector);
+    await page.waitForSelector(selector);
+    console.log("clicking selector ", selector);
+    await page.$$eval(selector, (elements) =>
+        elements.map((el) => el.click())
+    );
+    if (wait_to_disappear) {
+        console.log("waiting for element to vanish: " + selector)
+        await page.waitFor(
+            (selector) => !document.querySelector(selector),
+            selector);
+    }
+};
+
+async function find_and_click2(page, selector, wait_to_disappear, no_click) {
+    // alternate implementation: poll for the element from inside the page.
+    var found = false;
+    while (!found) {
+        found = await page.evaluate(
+            async function(selector, no_click) {
+                var element = document.querySelector(selector);
+                if (element) {
+                    if (!no_click) {
+                        element.click();
+                    }
+                    return true;
+                }
+                return false;
+            },
+            selector, no_click
+        );
+        if (!found) {
+            console.log("looking for " + selector);
+            await sleep(2500);
+        }
+    }
+    if (wait_to_disappear) {
+        console.log("waiting for element to vanish: " + selector)
+        await page.waitFor(
+            (selector) => !document.querySelector(selector),
+            selector);
+    }
+};
+
+async function restart_and_run_all(page) {
+    const confirm_selector = "div.modal-dialog button.btn-danger";
+    await find_and_click2(page, "#restart_run_all a");
+    await sleep(200);
+    // the confirm dialog doesn't always appear.
+    var needs_confirmation = await page.evaluate(
+        (selector) => !!document.querySelector(selector),
+        confirm_selector);
+    if (needs_confirmation) {
+        // find_and_click2: the waitForSelector version fails sporadically here.
+        await find_and_click2(page, confirm_selector, true);
+    }
+};
+
+async function check_truthy(page, js_expression_str) {
+    var is_truthy = await page.evaluate("!!(" + js_expression_str + ")");
+    if (is_truthy) {
+        console.log("truthy: " + js_expression_str);
+    } else {
+        console.log("FALSY: " + js_expression_str);
+    }
+    return is_truthy;
+};
+
+module.exports = {
+    sleep, jupyter_start_url, jupyter_sub_url, jupyter_live_page,
+    wait_until_there, wait_until_gone, substring_exists, substring_exists2,
+    find_and_click, find_and_click2, restart_and_run_all, check_truthy,
+};
@@ -0,0 +1,114 @@
+
+# Browser side benchmarks driven from benchmark.ipynb and read back by tests/benchmark.test.js.
+# Measurements are collected in window.chart_ipynb_bench in the page; the puppeteer test
+# waits for window.chart_ipynb_bench.done and writes them to a JSON report.
+
+import time
+import numpy as np
+from IPython.display import display
+from chart_ipynb import line, bar, scatter, pie
+
+sizes = (100, 1000, 10000, 100000)
+update_points = 2000
+
+bench_js = """
+    if (!window.chart_ipynb_bench) {
+        var heap = function () {
+            return (window.performance && performance.memory) ? performance.memory.usedJSHeapSize : null;
+        };
+        window.chart_ipynb_bench = {
+            results: [], marks: {}, done: false, heap: heap,
+            heap_start: heap(),
+        };
+    }
+"""
+
+def line_chart(n):
+    chart = line.Line(title="bench")
+    chart.add_dataset(list(range(n)), np.random.rand(n), "values")
+    return chart
+
+def bar_chart(n):
+    chart = bar.Bar(title="bench")
+    chart.add_dataset(list(range(n)), np.random.rand(n), "values")
+    return chart
+
+def scatter_chart(n):
+    chart = scatter.Scatter(title="bench")
+    chart.add_dataset(scatter.point_data(np.random.rand(n), np.random.rand(n)), "values")
+    return chart
+
+def pie_chart(n):
+    chart = pie.Pie(title="bench")
+    chart.add_dataset(["c%s" % i for i in range(n)], np.random.rand(n), "values")
+    return chart
+
+# chart type -> (builder, largest size, whether update_data applies)
+chart_types = {
+    "line": (line_chart, max(sizes), True),
+    "bar": (bar_chart, max(sizes), True),
+    "scatter": (scatter_chart, max(sizes), False),
+    "pie": (pie_chart, 1000, False),
+}
+
+def record(chart, **measurement):
+    "Append a measurement in the browser once the chart has painted everything sent so far."
+    chart.chart_js(bench_js + """
+        element.chart_info.when_rendered(function () {
+            var bench = window.chart_ipynb_bench;
+            var painted = Date.now();
+            if (measurement.started_ms) {
+                measurement.seconds = (painted - measurement.started_ms) / 1000.0;
+            }
+            if (measurement.mark) {
+                var mark = bench.marks[measurement.mark];
+                measurement.seconds = (performance.now() - mark.at) / 1000.0;
+                measurement.heap_growth_bytes = (bench.heap() === null) ? null : bench.heap() - mark.heap;
+                if (measurement.points) {
+                    measurement.points_per_second = measurement.points / measurement.seconds;
+                }
+                delete measurement.mark;
+            }
+            delete measurement.started_ms;
+            measurement.heap_bytes = bench.heap();
+            bench.results.push(measurement);
+        });
+    """, measurement=measurement)
+
+def mark(chart, name):
+    chart.chart_js(bench_js + """
+        var bench = window.chart_ipynb_bench;
+        bench.marks[name] = {at: performance.now(), heap: bench.heap()};
+    """, name=name)
+
+def measure(chart_type, n, timeout=120):
+    (build, largest, updates) = chart_types[chart_type]
+    chart = build(n)
+    started = time.time()
+    chart.setup()
+    display(chart)
+    record(chart, name="e2e_setup_to_paint_" + chart_type, size=n, started_ms=started * 1000.0)
+    chart.wait_rendered(timeout)
+    if updates:
+        name = "%s_%s_updates" % (chart_type, n)
+        mark(chart, name)
+        for i in range(update_points):
+            chart.update_data(float(i), "u%s" % i)
+        record(chart, name="e2e_update_data_" + chart_type, size=n, mark=name, points=update_points)
+        chart.wait_rendered(timeout)
+    return chart
+
+def run_all(chart_type_names=None):
+    if chart_type_names is None:
+        chart_type_names = list(chart_types)
+    chart = None
+    for chart_type in chart_type_names:
+        (build, largest, updates) = chart_types[chart_type]
+        for n in sizes:
+            if n <= largest:
+                chart = measure(chart_type, n)
+    chart.chart_js(bench_js + """
+        var bench = window.chart_ipynb_bench;
+        bench.heap_end = bench.heap();
+        bench.done = true;
+    """)
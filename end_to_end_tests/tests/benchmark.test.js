@@ -0,0 +1,64 @@
+
+// Browser render benchmarks (setup() to first paint, update_data throughput, JS heap growth).
+// Only runs in benchmark mode:
+//     CHART_BENCHMARK=1 npx jest tests/benchmark.test.js     (or: npm run benchmark)
+// The report is written to BENCHMARK_OUTPUT (default benchmark_results/e2e-<commit>.json)
+// in the format of benchmarks/run_benchmarks.py, so
+//     python ../benchmarks/run_benchmarks.py --compare old.json new.json
+// tracks browser side regressions too.
+
+const fs = require("fs");
+const path = require("path");
+const child_process = require("child_process");
+const helpers = require("../jest/notebook_helpers.js");
+
+const benchmark_mode = !!process.env.CHART_BENCHMARK;
+const describe_benchmark = benchmark_mode ? describe : describe.skip;
+
+function commit() {
+    try {
+        return child_process.execSync("git rev-parse --short HEAD").toString().trim();
+    } catch (error) {
+        return "unknown";
+    }
+};
+
+describe_benchmark("browser benchmarks", () => {
+
+    it("measures chart rendering in a live notebook", async () => {
+        const notebook = "notebooks/notebook_tests/benchmark.ipynb";
+        const page = await helpers.jupyter_live_page(browser, notebook, false);
+        const metrics_before = await page.metrics();
+        await helpers.restart_and_run_all(page);
+        console.log("waiting for the benchmark notebook to finish...");
+        await page.waitForFunction(
+            () => window.chart_ipynb_bench && window.chart_ipynb_bench.done,
+            {timeout: 0, polling: 1000});
+        // collect garbage when chrome runs with --js-flags=--expose-gc so heap numbers are comparable.
+        await page.evaluate(() => window.gc && window.gc());
+        const metrics_after = await page.metrics();
+        const bench = await page.evaluate(() => window.chart_ipynb_bench);
+        const results = bench.results.map((measurement) => Object.assign({module: "e2e"}, measurement));
+        const report = {
+            commit: commit(),
+            timestamp: new Date().toISOString(),
+            browser: await browser.version(),
+            heap_start_bytes: bench.heap_start,
+            heap_end_bytes: bench.heap_end,
+            js_heap_growth_bytes: metrics_after.JSHeapUsedSize - metrics_before.JSHeapUsedSize,
+            results: results,
+        };
+        const output = process.env.BENCHMARK_OUTPUT ||
+            path.join("benchmark_results", "e2e-" + report.commit + ".json");
+        fs.mkdirSync(path.dirname(output), {recursive: true});
+        fs.writeFileSync(output, JSON.stringify(report, null, 1));
+        console.log("wrote " + output);
+        for (const r of results) {
+            console.log(r.name + " size=" + r.size + " " + r.seconds.toFixed(4) + "s" +
+                (r.points_per_second ? " points/s=" + Math.round(r.points_per_second) : ""));
+        }
+        expect(results.length).toBeGreaterThan(0);
+    },
+    3600000, // the whole benchmark may take a while.
+    );
+});
@@ -0,0 +1,52 @@
+import unittest
+import pandas as pd
+
+from chart_ipynb import aggregation
+
+class TestAggregation(unittest.TestCase):
+
+    def frame(self):
+        return pd.DataFrame({
+            'label': ['b', 'a', 'b', 'c', 'a'],
+            'v': [1.0, 2.0, 3.0, 4.0, 6.0],
+            'w': [10, 20, 30, 40, 50],
+        })
+
+    def test_aggregate_default_sum(self):
+        labels, series = aggregation.aggregate(self.frame(), 'label', 'v')
+        self.assertEqual(labels, ['a', 'b', 'c'])
+        self.assertEqual(series, [('dataset1', [8.0, 4.0, 4.0])])
+
+    def test_aggregate_multiple(self):
+        labels, series = aggregation.aggregate(
+            self.frame(), 'label', ['v', 'w'], agg=['mean', 'count', 'q50'], sort=False)
+        self.assertEqual(labels, ['b', 'a', 'c'])
+        self.assertEqual([name for (name, values) in series],
+                         ['v (mean)', 'v (count)', 'v (q50)', 'w (mean)', 'w (count)', 'w (q50)'])
+        values = dict(series)
+        self.assertEqual(values['v (mean)'], [2.0, 4.0, 4.0])
+        self.assertEqual(values['w (count)'], [2, 2, 1])
+        self.assertEqual(values['w (q50)'], [20.0, 35.0, 40.0])
+
+    def test_aggregate_categorical(self):
+        df = self.frame()
+        df['label'] = pd.Categorical(df['label'], categories=['a', 'b', 'c', 'unused'])
+        labels, series = aggregation.aggregate(df, 'label', 'w', agg='max')
+        self.assertEqual(labels, ['a', 'b', 'c'])
+        self.assertEqual(series, [('dataset1', [50, 30, 40])])
+
+    def test_aggregate_names(self):
+        labels, series = aggregation.aggregate(self.frame(), 'label', ['v', 'w'])
+        self.assertEqual([name for (name, values) in series], ['v', 'w'])
+        labels, series = aggregation.aggregate(self.frame(), 'label', 'v', agg=['min', 'max'])
+        self.assertEqual([name for (name, values) in series], ['v (min)', 'v (max)'])
+
+    def test_parse_agg(self):
+        self.assertEqual(aggregation.parse_agg(None), ('sum', 'sum'))
+        self.assertEqual(aggregation.parse_agg('p90'), ('p90', 0.9))
+        self.assertEqual(aggregation.parse_agg(0.25), ('q25', 0.25))
+        with self.assertRaises(ValueError):
+            aggregation.parse_agg('mode')
+
+    def test_frame_datasets_without_columns(self):
+        self.assertEqual(aggregation.frame_datasets(self.frame(), None, None), (None, [('dataset1', None)]))
@@ -23,4 +23,21 @@ class TestBar(unittest.TestCase):
         df = pd.DataFrame({'t':['t1','t2'],'v':[1,1]})
         bar.bar_chart('test',df, 't','v')
         bar.bar_chart('test',{'label':['t1','t2'],'dataset1':[1,1]})
-        assert mock_bar.called
\ No newline at end of file
+        assert mock_bar.called
+
+    def test_bar_chart_decimate(self):
+        import numpy as np
+        data = {'label': list(range(5000)), 'dataset1': np.random.rand(5000).tolist()}
+        with patch.object(bar.Bar, 'setup'):
+            chart = bar.bar_chart('test', data, decimate=True)
+        assert len(chart.labels) <= 2 * chart.width
+        self.assertEqual(len(chart.datasets[0]['data']), len(chart.labels))
+
+    def test_bar_chart_datasets_per_column(self):
+        import pandas as pd
+        df = pd.DataFrame({'t': ['t1', 't2', 't1'], 'v': [1, 2, 3], 'w': [4, 5, 6]})
+        with patch.object(bar.Bar, 'setup'):
+            chart = bar.bar_chart('test', df, 't', ['v', 'w'], agg='mean')
+        self.assertEqual(chart.labels, ['t1', 't2'])
+        self.assertEqual([dataset['label'] for dataset in chart.datasets], ['v', 'w'])
+        self.assertEqual(chart.datasets[1]['data'], [5.0, 5.0])
@@ -0,0 +1,43 @@
+import unittest
+from unittest.mock import patch
+from unittest.mock import MagicMock
+import json
+import os
+import tempfile
+
+from chart_ipynb import batch_render, utils
+
+class TestBatchRender(unittest.TestCase):
+
+    def test_chart_config(self):
+        config = {'type': 'scatter', 'data': {'datasets': [{'data': utils.typed_columns(x=[1], y=[2])}]}}
+        chart = MagicMock()
+        chart.config = config
+        self.assertEqual(batch_render.chart_config(chart)['data']['datasets'][0]['data'], [{'x': 1.0, 'y': 2.0}])
+        self.assertEqual(batch_render.chart_config({'type': 'line'}), {'type': 'line'})
+        chart.config = None
+        self.assertRaises(ValueError, lambda: batch_render.chart_config(chart))
+
+    @patch("subprocess.run")
+    def test_render_charts(self, mock_run):
+        jobs = []
+        def run(command, **kwargs):
+            with open(command[-1]) as f:
+                jobs.append(json.load(f))
+            report = {'paths': [c['path'] for c in jobs[0]['charts']], 'count': 2,
+                      'pool_size': 2, 'seconds': 0.5, 'charts_per_second': 4.0}
+            return MagicMock(returncode=0, stdout="log line\n" + json.dumps(report))
+        mock_run.side_effect = run
+        out_dir = os.path.join(tempfile.mkdtemp(), 'charts')
+        report = batch_render.render_charts([{'type': 'line'}, {'type': 'bar'}], out_dir, pool_size=2)
+        self.assertEqual(report['charts_per_second'], 4.0)
+        job = jobs[0]
+        self.assertEqual(job['pool_size'], 2)
+        self.assertEqual([c['config']['type'] for c in job['charts']], ['line', 'bar'])
+        assert job['charts'][1]['path'].endswith('chart_0001.png')
+        assert os.path.isdir(out_dir)
+
+    @patch("subprocess.run")
+    def test_render_charts_failure(self, mock_run):
+        mock_run.return_value = MagicMock(returncode=1, stderr="no puppeteer")
+        self.assertRaises(RuntimeError, lambda: batch_render.render_charts([], tempfile.mkdtemp()))
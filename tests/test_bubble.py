@@ -27,4 +27,11 @@ class TestBubble(unittest.TestCase):
         bubble.bubble_chart('t',d2)
         bubble.bubble_chart('t',d3)
         bubble.bubble_chart('t',d4)
-        assert mock_bubble.called
\ No newline at end of file
+        assert mock_bubble.called
+
+    def test_bubble_chart_radius(self):
+        import pandas as pd
+        df = pd.DataFrame({'x':[1,3],'y':[2,4],'size':[5,10]})
+        with patch.object(bubble.Bubble, 'setup'):
+            chart = bubble.bubble_chart('t', df, 'x', 'y', r='size')
+        self.assertEqual(chart.datasets[0]['data'], [{'x': 1.0, 'y': 2.0, 'r': 5.0}, {'x': 3.0, 'y': 4.0, 'r': 10.0}])
@@ -3,6 +3,7 @@ from unittest.mock import patch
 from unittest.mock import MagicMock
 
 from chart_ipynb import chart_framework
+from chart_ipynb import utils
 import jp_proxy_widget
 
 class TestChartFramework(unittest.TestCase):
@@ -24,6 +25,19 @@ class TestChartFramework(unittest.TestCase):
         widget.initialize_chart(width, config)
         assert arguments["width"] == width
 
+    @patch("chart_ipynb.chart_framework.load_requirements")
+    def test_initialize_chart_typed_transport(self, mock_load_requirements):
+        widget = chart_framework.ChartSuperClass()
+        arguments = {}
+        def mock_js_init(*args, **kwargs):
+            arguments.update(kwargs)
+        widget.js_init = mock_js_init
+        config = {'data': {'datasets': [{'data': [1.0, 2.0]}]}}
+        widget.initialize_chart(100, config, transport="float32")
+        data = arguments["config"]["data"]["datasets"][0]["data"]
+        self.assertEqual(data["typed_array"], "Float32Array")
+        self.assertEqual(config['data']['datasets'][0]['data'], [1.0, 2.0])
+
     @patch("chart_ipynb.chart_framework.ChartSuperClass")
     @patch("chart_ipynb.utils.options")
     def test_example_donut(self, mock_chart_superclass, mock_options):
@@ -49,6 +63,30 @@ class TestChartFramework(unittest.TestCase):
         assert widgets[0].load_js_files.called
         assert not widgets[0].some_other_method.called
 
+    def test_load_requirements_skips_loaded_page(self):
+        widget = MagicMock()
+        reports = []
+        def js_init(code, report=None, **kwargs):
+            if report is not None:
+                reports.append(report)
+        widget.js_init = js_init
+        before = chart_framework.loader_statistics()
+        chart_framework.load_requirements(widget)
+        chart_framework.load_requirements(widget)
+        assert not widget.load_js_files.called
+        reports[0]("missing")
+        reports[1]("pending")
+        assert widget.load_js_files.call_count == 1
+        after = chart_framework.loader_statistics()
+        self.assertEqual(after["requested"] - before["requested"], 2)
+        self.assertEqual(after["sent"] - before["sent"], 1)
+        self.assertEqual(after["skipped"] - before["skipped"], 1)
+
+    def test_load_requirements_force(self):
+        widget = MagicMock()
+        chart_framework.load_requirements(widget, force=True)
+        assert widget.load_js_files.called
+
     @patch("jp_proxy_widget.JSProxyWidget")
     def test_default_options(self, mock_proxy_widget):
         widget = chart_framework.ChartSuperClass()
@@ -81,6 +119,56 @@ class TestChartFramework(unittest.TestCase):
         assert not arguments
         assert not widget.clicked_info
 
+    def test_receive_clicks(self):
+        widget = chart_framework.ChartSuperClass()
+        widget.config = {'data': {'labels': ['a', 'b'],
+                                  'datasets': [{'label': 'first', 'data': [1, 2],
+                                                'backgroundColor': ['red', 'blue'], 'borderColor': 'black'}]}}
+        arguments = {}
+        def mock_js_init(*args, **kwargs):
+            arguments.update(kwargs)
+        widget.js_init = mock_js_init
+        received = []
+        widget.click_callback(received.append, delay=10)
+        self.assertEqual(arguments['delay'], 10)
+        self.assertEqual(arguments['limit'], widget.event_history)
+        arguments['report_clicks']([[0, 1], [0, 5]])
+        self.assertEqual(received[0], {'dataIndex': 1, 'datasetIndex': 0, 'backgroundColor': 'blue',
+                                       'borderColor': 'black', 'datasetLabel': 'first',
+                                       'label': 'b', 'dataValue': 2})
+        self.assertEqual(received[1]['dataValue'], None)
+        self.assertEqual(list(widget.clicked_info), received)
+        widget.set_event_history(3)
+        arguments['report_clicks']([[0, 0]] * 5)
+        self.assertEqual(len(widget.clicked_info), 3)
+
+    def test_receive_clicks_plain_chart(self):
+        # a chart set up with initialize_chart only, like example_donut.
+        widget = chart_framework.ChartSuperClass()
+        arguments = {}
+        def mock_js_init(*args, **kwargs):
+            arguments.update(kwargs)
+        widget.js_init = mock_js_init
+        config = {'type': 'doughnut',
+                  'data': {'labels': ['x', 'y'],
+                           'datasets': [{'label': 'd', 'data': [3, 4], 'backgroundColor': ['red', 'green']}]}}
+        widget.initialize_chart(400, config, transport='float64')
+        received = []
+        widget.click_callback(received.append)
+        arguments['report_clicks']([[0, 1]])
+        self.assertEqual(received[0]['label'], 'y')
+        self.assertEqual(received[0]['dataValue'], 4)
+        self.assertEqual(received[0]['backgroundColor'], 'green')
+
+    def test_element_details_typed(self):
+        datasets = [{'data': utils.typed_array([1.5, 2.5, None]), 'label': 'a'}]
+        with patch("chart_ipynb.utils.unpack_data") as mock_unpack:
+            details = chart_framework.element_details(datasets, None, 0, 1)
+        assert not mock_unpack.called
+        self.assertEqual(details['dataValue'], 2.5)
+        self.assertEqual(chart_framework.element_details(datasets, None, 0, 2)['dataValue'], None)
+        self.assertEqual(chart_framework.element_details(datasets, None, 0, 3)['dataValue'], None)
+
     def test_off_click(self):
         widget = chart_framework.ChartSuperClass()
         arguments = {}
@@ -101,33 +189,161 @@ class TestChartFramework(unittest.TestCase):
                 return {'data':'07070707',
                         'width': 1,
                         'height': 1}
-        def get_pixels():
+        encodings = []
+        def get_pixels(encoding):
+            encodings.append(encoding)
             return dummy()
         widget.element.chart_info.get_pixels = get_pixels
         img_arr = widget.pixels_array()
         assert isinstance(img_arr, np.ndarray)
         self.assertEqual(img_arr.tolist(), [[[7,7,7,7]]])
+        self.assertEqual(encodings, ['hex'])
+
+    def test_decode_pixels(self):
+        import base64
+        payload = {'data': base64.b64encode(bytes([1, 2, 3, 4, 5, 6, 7, 8])).decode('ascii'),
+                   'encoding': 'base64', 'width': 2, 'height': 1}
+        img_arr = chart_framework.decode_pixels(payload)
+        self.assertEqual(img_arr.tolist(), [[[1, 2, 3, 4], [5, 6, 7, 8]]])
 
     def test_embed_image(self):
         widget = chart_framework.ChartSuperClass()
-        def pixels_array():
-            import numpy as np
-            return np.ones((10,15,3))
-        widget.pixels_array = pixels_array
+        formats = []
+        def image_bytes(format, quality):
+            formats.append(format)
+            return b'not really a png'
+        widget.image_bytes = image_bytes
         widget.embed_image()
+        self.assertEqual(formats, ['png'])
 
     def test_save_image(self):
         import numpy as np
         widget = chart_framework.ChartSuperClass()
-        def pixels_array():
-            return np.ones((10,15,3))
-        widget.pixels_array = pixels_array
+        def image_bytes(format, quality):
+            return ('%s image bytes' % format).encode('ascii')
+        widget.image_bytes = image_bytes
         import tempfile
+        import os
         file = tempfile.NamedTemporaryFile(suffix='.png')
         widget.save_image(file)
-        response = {}
+        file.flush()
         with open(file.name, 'rb') as f:
-            data = {'image': f}
-            response.update(data)
-        assert response['image']
-        
\ No newline at end of file
+            self.assertEqual(f.read(), b'png image bytes')
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'chart.WEBP')
+        widget.save_image(path)
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), b'webp image bytes')
+        def pixels_array():
+            return np.ones((10,15,4), dtype=np.ubyte)
+        widget.pixels_array = pixels_array
+        path = os.path.join(directory, 'chart.bmp')
+        widget.save_image(path)
+        assert os.path.exists(path)
+
+    def test_async_capture(self):
+        import asyncio
+        import base64
+        import os
+        import tempfile
+        widget = chart_framework.ChartSuperClass()
+        in_flight = []
+        peak = []
+        def chart_js(body, deliver, **other):
+            loop = asyncio.get_event_loop()
+            in_flight.append(body)
+            peak.append(len(in_flight))
+            if 'get_pixels' in body:
+                value = {'data': base64.b64encode(bytes([9, 9, 9, 9])).decode('ascii'),
+                         'encoding': 'base64', 'width': 1, 'height': 1}
+            else:
+                value = {'data': base64.b64encode(b'image bytes').decode('ascii'), 'mime': other['mime']}
+            def respond():
+                in_flight.remove(body)
+                deliver(value)
+            loop.call_later(0.01, respond)
+        widget.chart_js = chart_js
+        path = os.path.join(tempfile.mkdtemp(), 'chart.png')
+        async def captures():
+            chart_framework.set_capture_limits(concurrency=2)
+            try:
+                pixels = await asyncio.gather(*[widget.pixels_array_async() for i in range(5)])
+                await widget.save_image_async(path)
+            finally:
+                chart_framework.set_capture_limits(concurrency=8)
+            return pixels
+        pixels = asyncio.run(captures())
+        self.assertEqual([p.tolist() for p in pixels], [[[[9, 9, 9, 9]]]] * 5)
+        self.assertEqual(max(peak), 2)
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), b'image bytes')
+
+    def test_async_capture_timeout(self):
+        import asyncio
+        widget = chart_framework.ChartSuperClass()
+        widget.chart_js = lambda body, **other: None
+        async def capture():
+            return await widget.pixels_array_async(timeout=0.01)
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(capture())
+
+    def test_async_capture_in_kernel(self):
+        # in a kernel the capture processes messages itself, so it resolves while a cell runs.
+        import asyncio
+        import base64
+        widget = chart_framework.ChartSuperClass()
+        delivers = []
+        widget.chart_js = lambda body, deliver, **other: delivers.append(deliver)
+        polls = []
+        async def poll(n):
+            polls.append(n)
+            if len(polls) == 2:
+                delivers[-1]({'data': base64.b64encode(bytes([1, 2, 3, 4])).decode('ascii'),
+                              'encoding': 'base64', 'width': 1, 'height': 1})
+        class ui_events(object):
+            async def __aenter__(self):
+                return poll
+            async def __aexit__(self, *exception):
+                pass
+        with patch("chart_ipynb.chart_framework.in_kernel", return_value=True), \
+                patch("jupyter_ui_poll.ui_events", ui_events):
+            async def capture():
+                return await widget.pixels_array_async(timeout=5)
+            pixels = asyncio.run(capture())
+            self.assertEqual(pixels.tolist(), [[[1, 2, 3, 4]]])
+            self.assertEqual(len(polls), 2)
+            widget.chart_js = lambda body, deliver, **other: None
+            with self.assertRaises(asyncio.TimeoutError):
+                asyncio.run(widget._capture_value("1", 0.05, {}))
+
+    def test_wait_rendered(self):
+        import contextlib
+        widget = chart_framework.ChartSuperClass()
+        callbacks = []
+        def chart_js(body, done, **other):
+            assert 'when_rendered' in body
+            callbacks.append(done)
+        widget.chart_js = chart_js
+        polls = []
+        def poll(n):
+            polls.append(n)
+            if len(polls) == 3:
+                callbacks[-1](True)
+        @contextlib.contextmanager
+        def ui_events():
+            yield poll
+        with patch("jupyter_ui_poll.ui_events", ui_events):
+            assert widget.wait_rendered(timeout=5)
+            self.assertEqual(len(polls), 3)
+            assert not widget.wait_rendered(timeout=0.05, poll_interval=0.01)
+
+    def test_decode_image(self):
+        import base64
+        import io
+        from PIL import Image
+        output = io.BytesIO()
+        Image.new('RGBA', (3, 2)).save(output, format='PNG')
+        payload = {'data': base64.b64encode(output.getvalue()).decode('ascii'), 'mime': 'image/png'}
+        self.assertEqual(chart_framework.decode_image(payload, 'png'), output.getvalue())
+        converted = chart_framework.decode_image(payload, 'webp')
+        self.assertEqual(Image.open(io.BytesIO(converted)).format, 'WEBP')
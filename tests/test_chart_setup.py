@@ -124,6 +124,69 @@ class TestChartInit(unittest.TestCase):
         assert len(widget.datasets[0]['data'])==2
         self.assertRaises(ValueError, lambda:widget.update_data(2, 'test2'))
 
+    def test_extend(self):
+        import numpy as np
+        widget = chart_setup.Chart_init()
+        widget.datasets = [{'label':'a','data':[1]}, {'label':'b','data':[2]}]
+        widget.labels = ['t1']
+        widget.dataset_name = ['a', 'b']
+        arguments = {}
+        calls = []
+        def mock_js_init(*args, **kwargs):
+            calls.append(kwargs)
+            arguments.update(kwargs)
+        widget.js_init = mock_js_init
+        widget.extend({'a': np.array([3, 4]), 'b': [5, 6]}, labels=['t1', 't2', 't3'])
+        assert len(calls) == 1
+        self.assertEqual(arguments['updates'], [[0, [3, 4]], [1, [5, 6]]])
+        self.assertEqual(arguments['labels'], ['t2', 't3'])
+        self.assertEqual(widget.datasets[0]['data'], [1, 3, 4])
+        self.assertEqual(widget.labels, ['t1', 't2', 't3'])
+        widget.transport = 'float32'
+        widget.append_many([7], labels=['t4'])
+        self.assertEqual(arguments['updates'][0][1]['typed_array'], 'Float32Array')
+        self.assertEqual(widget.datasets[0]['data'], [1, 3, 4, 7])
+        # the transport given to setup() is used for later updates too.
+        widget = chart_setup.Chart_init()
+        widget.js_init = mock_js_init
+        widget.datasets = [{'label':'a','data':[1.0]}]
+        widget.labels = ['t1']
+        widget.dataset_name = ['a']
+        widget.setup(transport='float64')
+        widget.extend([2.0], labels=['t2'])
+        self.assertEqual(arguments['updates'][0][1]['typed_array'], 'Float64Array')
+
+    def test_window(self):
+        widget = chart_setup.Chart_init(max_points=3)
+        widget.js_init = lambda *args, **kwargs: None
+        widget.labels = ['t1', 't2']
+        widget.datasets = [{'label':'a','data':widget.windowed([1, 2])}]
+        widget.dataset_name = ['a']
+        for i in range(3, 7):
+            widget.update_data(i, 't%s' % i)
+        self.assertEqual(widget.labels.tolist(), ['t4', 't5', 't6'])
+        self.assertEqual(widget.datasets[0]['data'].tolist(), [4.0, 5.0, 6.0])
+        widget.extend([7, 8], labels=['t7', 't8'])
+        self.assertEqual(widget.labels.tolist(), ['t6', 't7', 't8'])
+        self.assertEqual(widget.plain_datasets()[0]['data'], [6.0, 7.0, 8.0])
+        widget.set_window(None)
+        self.assertEqual(widget.labels, ['t6', 't7', 't8'])
+
+    def test_downsample(self):
+        import numpy as np
+        widget = chart_setup.Chart_init()
+        widget.labels = ['t%s' % i for i in range(1000)]
+        widget.datasets = [{'data': np.sin(np.linspace(0, 10, 1000)).tolist()},
+                           {'data': list(range(1000))}]
+        widget.downsample(100)
+        n = len(widget.labels)
+        assert 100 <= n <= 200
+        self.assertEqual(len(widget.datasets[1]['data']), n)
+        self.assertEqual(widget.labels[0], 't0')
+        self.assertEqual(widget.labels[-1], 't999')
+        widget.datasets[0]['data'] = [1]
+        self.assertRaises(ValueError, lambda: widget.downsample(10))
+
     @patch("chart_ipynb.utils.dataset")
     def test_update_dataset(self, mock_dataset):
         widget = chart_setup.Chart_init()
@@ -147,6 +210,22 @@ class TestChartInit(unittest.TestCase):
         self.assertEqual(widget.datasets, [{'data': [2, 3]}])
         self.assertEqual(widget.labels, ['test2', 'test3'])
 
+    def test_receive_removals(self):
+        widget = chart_setup.Chart_init()
+        widget.datasets = [{'data':[1,2,3]}]
+        widget.labels = ['test1', 'test2', 'test3']
+        arguments = {}
+        def mock_js_init(*args, **kwargs):
+            arguments.update(kwargs)
+        widget.js_init = mock_js_init
+        widget.set_event_history(1)
+        widget.remove_data()
+        self.assertEqual(arguments['delay'], widget.event_delay)
+        arguments['report_removals']([[0, 2, False, True], [0, 0, False, True]])
+        self.assertEqual(widget.datasets, [{'data': [2]}])
+        self.assertEqual(list(widget.remove_item), [{'datasetIndex': 0, 'dataIndex': 0}])
+        self.assertEqual(widget.event_details(0, 0)['dataValue'], 2)
+
     def test_remove_dataset(self):
         arguments = {}
         def mock_js_init(*args, **kwargs):
@@ -0,0 +1,91 @@
+import unittest
+import datetime
+import os
+import tempfile
+
+import pandas as pd
+
+from chart_ipynb import data_cache
+
+def day(text):
+    return datetime.date.fromisoformat(text)
+
+class StandInReader:
+    "Offline reader returning one row per calendar day."
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, symbol, source, start, end, **other_arguments):
+        self.calls.append((symbol, start.date(), end.date()))
+        dates = pd.date_range(start, end, freq="D", name="Date")
+        return pd.DataFrame({"Close": [float(d.day) for d in dates]}, index=dates)
+
+class TestDataCache(unittest.TestCase):
+
+    def setUp(self):
+        self.now = [1000.0]
+        self.reader = StandInReader()
+        self.cache = data_cache.DataCache(tempfile.mkdtemp(), ttl=60, reader=self.reader,
+                                          clock=lambda: self.now[0])
+
+    def test_missing_ranges(self):
+        intervals = [(day("2020-01-05"), day("2020-01-10")), (day("2020-01-15"), day("2020-01-20"))]
+        self.assertEqual(data_cache.missing_ranges(intervals, day("2020-01-01"), day("2020-01-31")),
+                         [(day("2020-01-01"), day("2020-01-04")),
+                          (day("2020-01-11"), day("2020-01-14")),
+                          (day("2020-01-21"), day("2020-01-31"))])
+        self.assertEqual(data_cache.missing_ranges(intervals, day("2020-01-06"), day("2020-01-09")), [])
+
+    def test_merge_ranges(self):
+        merged = data_cache.merge_ranges([(day("2020-01-05"), day("2020-01-10"), 5),
+                                          (day("2020-01-01"), day("2020-01-04"), 7),
+                                          (day("2020-02-01"), day("2020-02-02"), 9)])
+        self.assertEqual(merged, [(day("2020-01-01"), day("2020-01-10"), 5),
+                                  (day("2020-02-01"), day("2020-02-02"), 9)])
+
+    def test_fetches_only_missing_ranges(self):
+        frame = self.cache.get("AAPL", "stooq", "2020-01-10", "2020-01-20")
+        self.assertEqual(len(frame), 11)
+        frame = self.cache.get("AAPL", "stooq", "2020-01-01", "2020-01-31")
+        self.assertEqual(len(frame), 31)
+        self.assertEqual(self.reader.calls, [
+            ("AAPL", day("2020-01-10"), day("2020-01-20")),
+            ("AAPL", day("2020-01-01"), day("2020-01-09")),
+            ("AAPL", day("2020-01-21"), day("2020-01-31")),
+        ])
+        frame = self.cache.get("AAPL", "stooq", "2020-01-05", "2020-01-25")
+        self.assertEqual(len(self.reader.calls), 3)
+        self.assertEqual(list(frame["Close"]), [float(d) for d in range(5, 26)])
+        self.assertEqual(self.cache.hits, 1)
+        # a fresh cache object reads the same files and index.
+        reopened = data_cache.DataCache(self.cache.directory, reader=self.reader, clock=lambda: self.now[0])
+        self.assertEqual(len(reopened.get("AAPL", "stooq", "2020-01-01", "2020-01-31")), 31)
+        self.assertEqual(len(self.reader.calls), 3)
+
+    def test_ttl(self):
+        self.cache.get("AAPL", "stooq", "2020-01-01", "2020-01-10")
+        self.now[0] += 30
+        self.cache.get("AAPL", "stooq", "2020-01-01", "2020-01-10")
+        self.assertEqual(len(self.reader.calls), 1)
+        self.now[0] += 61
+        self.cache.get("AAPL", "stooq", "2020-01-01", "2020-01-10")
+        self.assertEqual(len(self.reader.calls), 2)
+
+    def test_lru_eviction(self):
+        self.cache.get("A", "stooq", "2020-01-01", "2020-12-31")
+        size = self.cache.total_bytes()
+        self.cache.max_bytes = int(size * 2.5)
+        self.now[0] += 1
+        self.cache.get("B", "stooq", "2020-01-01", "2020-12-31")
+        self.now[0] += 1
+        self.cache.get("A", "stooq", "2020-01-01", "2020-12-31")
+        self.now[0] += 1
+        self.cache.get("C", "stooq", "2020-01-01", "2020-12-31")
+        index = self.cache.read_index()
+        self.assertEqual(sorted(entry["symbol"] for entry in index.values()), ["A", "C"])
+        assert self.cache.total_bytes() <= self.cache.max_bytes
+        files = [name for name in os.listdir(self.cache.directory) if name != "index.json"]
+        self.assertEqual(len(files), 2)
+        self.cache.clear()
+        self.assertEqual(self.cache.total_bytes(), 0)
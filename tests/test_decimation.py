@@ -0,0 +1,76 @@
+import unittest
+import numpy as np
+
+from chart_ipynb import decimation
+
+class TestDecimation(unittest.TestCase):
+
+    def test_lttb_indices(self):
+        y = np.sin(np.linspace(0, 20, 1000))
+        keep = decimation.lttb_indices(y, 50)
+        self.assertEqual(len(keep), 50)
+        self.assertEqual(keep[0], 0)
+        self.assertEqual(keep[-1], 999)
+        assert np.all(np.diff(keep) > 0)
+        # the peaks of the sine wave survive
+        assert y[keep].max() > 0.99
+        assert y[keep].min() < -0.99
+
+    def test_lttb_short_series(self):
+        self.assertEqual(decimation.lttb_indices([1, 2, 3], 10).tolist(), [0, 1, 2])
+        self.assertEqual(decimation.lttb_indices([1, 2, 3, 4], 2).tolist(), [0, 3])
+
+    def test_lttb_nan(self):
+        y = np.array([0.0, np.nan, 1.0, 5.0, np.nan, 0.0])
+        keep = decimation.lttb_indices(y, 4)
+        self.assertEqual(keep.tolist(), [0, 2, 3, 5])
+
+    def test_keep_indices(self):
+        a = np.zeros(100)
+        a[10] = 5
+        b = np.zeros(100)
+        b[90] = 5
+        keep = decimation.keep_indices([a, b], 10)
+        assert 10 in keep
+        assert 90 in keep
+
+    def test_minmax_indices(self):
+        y = np.random.RandomState(0).rand(10000)
+        y[4321] = 10
+        y[777] = -10
+        keep = decimation.minmax_indices(y, 100)
+        assert len(keep) <= 200
+        assert 4321 in keep
+        assert 777 in keep
+        self.assertEqual(decimation.minmax_indices([3, 1, 2], 5).tolist(), [0, 1, 2])
+        keep = decimation.minmax_indices([1, 5, 2, 8, 3, 9, 1, 0, 4, np.nan], 2)
+        self.assertEqual(keep.tolist(), [0, 3, 5, 7])
+
+    def test_minmax_several_columns(self):
+        from chart_ipynb import chart_setup
+        random = np.random.RandomState(1)
+        widget = chart_setup.Chart_init()
+        widget.labels = list(range(10000))
+        widget.datasets = [{'data': random.rand(10000).tolist()} for _ in range(6)]
+        widget.datasets[4]['data'][1234] = 50.0
+        widget.decimate(width=100)
+        n = len(widget.labels)
+        assert n <= 200
+        self.assertEqual(sum(len(dataset['data']) for dataset in widget.datasets), 6 * n)
+        assert 1234 in widget.labels
+        keep = decimation.keep_indices([random.rand(1000) for _ in range(4)], 20, method="minmax")
+        assert len(keep) <= 20
+
+    def test_minmax_spike_below_other_dataset(self):
+        random = np.random.RandomState(2)
+        a = 100 + random.rand(100000)
+        b = np.full(100000, 10.0)
+        b[54321] = 60.0
+        b[12345] = -5.0
+        keep = decimation.keep_indices([a, b], 1600, method="minmax")
+        assert len(keep) <= 1600
+        assert 54321 in keep
+        assert 12345 in keep
+        # the extremes of the other dataset stay too.
+        assert np.argmax(a) in keep
+        assert np.argmin(a) in keep
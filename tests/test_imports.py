@@ -0,0 +1,22 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class TestImports(unittest.TestCase):
+
+    def test_heavy_dependencies_deferred(self):
+        modules = ["bar", "line", "pie", "doughnut", "radar", "polarArea", "scatter", "bubble", "time_series"]
+        code = "; ".join(["import sys, json"] + ["import chart_ipynb." + m for m in modules] + [
+            "print(json.dumps([m for m in ('pandas', 'pandas_datareader', 'PIL') if m in sys.modules]))"])
+        output = subprocess.check_output([sys.executable, "-c", code], cwd=root)
+        self.assertEqual(json.loads(output.decode().strip().splitlines()[-1]), [])
+
+    def test_is_dataframe(self):
+        import pandas as pd
+        from chart_ipynb import utils
+        assert utils.is_dataframe(pd.DataFrame({'a': [1]}))
+        assert not utils.is_dataframe({'a': [1]})
@@ -0,0 +1,90 @@
+import json
+import unittest
+from unittest.mock import patch
+
+from chart_ipynb import chart_setup, instrumentation
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        instrumentation.reset()
+        instrumentation.enable()
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+
+    @patch("chart_ipynb.chart_framework.load_requirements")
+    def test_chart_stats(self, mock_load_requirements):
+        widget = chart_setup.Chart_init()
+        calls = []
+        def mock_js_init(body, **kwargs):
+            calls.append((body, kwargs))
+        widget.js_init = mock_js_init
+        widget.datasets = [{'label': 'test', 'data': [1, 2]}]
+        widget.labels = ['a', 'b']
+        widget.dataset_name = ['test']
+        widget.setup()
+        widget.update_data(3, 'c')
+        widget.update_data(4, 'd')
+        (body, kwargs) = calls[-1]
+        assert 'chart_stats' in body
+        self.assertEqual(kwargs['chart_operation'], 'update_data')
+        self.assertEqual(kwargs['data_value'], 4)
+        # bytes are measured as the kernel session packs the widget messages.
+        class Session(object):
+            def pack(self, value):
+                return json.dumps(value).encode('utf-8')
+        with patch("chart_ipynb.instrumentation.kernel_session", return_value=Session()), \
+                patch("jp_proxy_widget.JSProxyWidget.send_custom_message",
+                      lambda self, indicator, payload: instrumentation.kernel_session().pack(payload)):
+            widget.send_custom_message('commands', ['x' * 100])
+        kwargs['report_stats']([['render', 'render_seconds', 0.01],
+                                ['render', 'render_seconds', 0.03],
+                                ['update_data', 'transfer_seconds', 0.002]])
+        stats = widget.stats()
+        self.assertEqual(stats['update_data']['python_seconds']['count'], 2)
+        self.assertEqual(stats['initialize_chart+update_data']['bytes']['total'], 104)
+        self.assertEqual(stats['initialize_chart']['python_seconds']['count'], 1)
+        self.assertEqual(stats['initialize_chart']['prepare_seconds']['count'], 1)
+        self.assertEqual(stats['setup']['build_seconds']['count'], 1)
+        render = stats['render']['render_seconds']
+        self.assertAlmostEqual(render['p50'], 0.02)
+        self.assertAlmostEqual(render['max'], 0.03)
+        other = chart_setup.Chart_init()
+        other.js_init = mock_js_init
+        other.datasets = [{'label': 'test', 'data': [1]}]
+        other.setup()
+        aggregate = instrumentation.aggregate_stats()
+        self.assertEqual(aggregate['initialize_chart']['python_seconds']['count'], 2)
+        self.assertEqual(len(other.stats()['initialize_chart']['python_seconds']), 7)
+
+    @patch("chart_ipynb.chart_framework.load_requirements")
+    def test_disabled(self, mock_load_requirements):
+        instrumentation.disable()
+        widget = chart_setup.Chart_init()
+        calls = []
+        widget.js_init = lambda body, **kwargs: calls.append(kwargs)
+        widget.datasets = [{'label': 'test', 'data': [1]}]
+        widget.setup()
+        assert 'chart_operation' not in calls[-1]
+        self.assertEqual(widget.stats(), {})
+
+    def test_summarize(self):
+        summary = instrumentation.summarize(list(range(101)), percentiles=(50, 90))
+        self.assertEqual(summary['count'], 101)
+        self.assertEqual(summary['p50'], 50.0)
+        self.assertEqual(summary['p90'], 90.0)
+        self.assertEqual(summary['total'], 5050.0)
+
+    def test_bounded_samples(self):
+        recorder = instrumentation.Recorder(size=10)
+        for i in range(1000):
+            recorder.add('update_data', 'python_seconds', float(i))
+        values = recorder.records['update_data']['python_seconds']
+        self.assertEqual(len(values.recent), 10)
+        summary = recorder.summary(percentiles=(50,))['update_data']['python_seconds']
+        self.assertEqual(summary['count'], 1000)
+        self.assertEqual(summary['max'], 999.0)
+        self.assertEqual(summary['total'], 499500.0)
+        self.assertEqual(summary['p50'], 994.5)
@@ -0,0 +1,42 @@
+import time
+import unittest
+from unittest.mock import patch
+
+from chart_ipynb import lazy, bar, pie
+
+class TestLazy(unittest.TestCase):
+
+    @patch("chart_ipynb.bar.Bar")
+    def test_lazy_helper_defers_widget(self, mock_bar):
+        data = {'t1': 1, 't2': 2}
+        started = time.perf_counter()
+        specs = [bar.bar_chart('chart %s' % i, data, lazy=True) for i in range(1000)]
+        elapsed = time.perf_counter() - started
+        assert not mock_bar.called
+        self.assertLess(elapsed, 0.5)
+        spec = specs[3]
+        self.assertFalse(spec.rendered)
+        chart = spec.render()
+        mock_bar.assert_called_once_with(title='chart 3')
+        self.assertIs(spec.render(), chart)
+        self.assertTrue(spec.rendered)
+        assert chart.setup.called
+
+    @patch("chart_ipynb.pie.Pie")
+    def test_lazy_spec_delegates(self, mock_pie):
+        spec = pie.pie_chart('test', {'t1': 1}, lazy=True)
+        self.assertIn('not rendered', repr(spec))
+        spec.update_data(1, 't2')
+        assert mock_pie.return_value.update_data.called
+        with self.assertRaises(AttributeError):
+            spec._repr_html_
+        with patch("IPython.display.display") as mock_display:
+            spec._ipython_display_()
+        mock_display.assert_called_once_with(mock_pie.return_value)
+
+    def test_not_lazy(self):
+        calls = []
+        helper = lazy.deferrable(lambda *args, **kwargs: calls.append((args, kwargs)) or 'chart')
+        self.assertEqual(helper(1, a=2), 'chart')
+        self.assertIsInstance(helper(1, a=2, lazy=True), lazy.ChartSpec)
+        self.assertEqual(calls, [((1,), {'a': 2})])
@@ -0,0 +1,80 @@
+import unittest
+from unittest.mock import patch
+from unittest.mock import MagicMock
+
+from chart_ipynb import chart_framework, utils, scatter
+import jp_proxy_widget
+
+class TestScatter(unittest.TestCase):
+
+    @patch("chart_ipynb.chart_framework.load_requirements")
+    def test_init(self, mock_load_requirements):
+        widget = scatter.Scatter()
+        assert mock_load_requirements.called
+        assert widget.title == 'Scatter Chart'
+        assert widget.chart_type == 'scatter'
+
+    def test_point_data(self):
+        import numpy as np
+        x = np.array([1, 2])
+        points = scatter.point_data(x, np.array([3.5, 4]))
+        assert isinstance(points, utils.PointColumns)
+        self.assertEqual(points, [{'x': 1, 'y': 3.5}, {'x': 2, 'y': 4.0}])
+        assert 'typed_columns' in utils.pack_data(points)
+        points[0] = {'x': 5, 'y': 6}
+        self.assertEqual(x.tolist(), [1, 2])
+        points = scatter.point_data(['a', 'b'], [1, 2], r=[5, 6])
+        self.assertEqual(points, [{'x': 'a', 'y': 1, 'r': 5}, {'x': 'b', 'y': 2, 'r': 6}])
+
+    @patch("chart_ipynb.scatter.Scatter")
+    def test_scatter_chart(self, mock_scatter):
+        import pandas as pd
+        d1 = pd.DataFrame({'x':[1,3,5],'y':[1,3,5]})
+        d2 = [{'x':1,'y':1},{'x':3,'y':3},{'x':5,'y':5}]
+        d3 = {'x':[1,3,5],'y':[1,3,5]}
+        scatter.scatter_chart('t',d1,'x','y')
+        scatter.scatter_chart('t',d2)
+        scatter.scatter_chart('t',d3)
+        assert mock_scatter.called
+
+    def test_scatter_chart_remove(self):
+        import numpy as np
+        chart = scatter.Scatter()
+        chart.datasets = [{'label': 'a', 'data': scatter.point_data(np.array([1, 2, 3]), np.array([4, 5, 6]))}]
+        chart.callback_info({'datasetIndex': 0, 'dataIndex': 1}, remove_label=False, remove_data=True)
+        self.assertEqual(chart.datasets[0]['data'], [{'x': 1, 'y': 4}, {'x': 3, 'y': 6}])
+        self.assertEqual(chart.event_details(0, 1)['dataValue'], {'x': 3, 'y': 6})
+
+    def test_scatter_window_extend(self):
+        import numpy as np
+        chart = scatter.Scatter(max_points=3)
+        chart.js_init = lambda body, **kwargs: None
+        sent = []
+        chart.chart_js = lambda body, **kwargs: sent.append(kwargs)
+        chart.dataset_name = ['a']
+        chart.datasets = [{'label': 'a', 'data': chart.windowed(scatter.point_data(np.arange(5), np.arange(5)))}]
+        self.assertEqual(chart.datasets[0]['data'], [{'x': x, 'y': x} for x in (2, 3, 4)])
+        chart.extend([{'x': 5, 'y': 50}])
+        data = chart.datasets[0]['data']
+        assert isinstance(data, utils.PointColumns)
+        self.assertEqual(data.tolist(), [{'x': 3.0, 'y': 3.0}, {'x': 4.0, 'y': 4.0}, {'x': 5.0, 'y': 50.0}])
+        self.assertEqual(sent[-1]['updates'], [[0, [{'x': 5.0, 'y': 50.0}]]])
+        chart.set_window(None)
+        chart.extend([{'x': 6, 'y': 60}])
+        self.assertEqual(len(chart.datasets[0]['data']), 4)
+
+    @patch("chart_ipynb.chart_framework.load_requirements")
+    def test_spatial_index(self, mock_load_requirements):
+        widget = scatter.Scatter(spatial_index=True)
+        bodies = []
+        widget.js_init = lambda body, **kwargs: bodies.append((body, kwargs))
+        widget.datasets = [{'label': 'a', 'data': [{'x': 1, 'y': 2}]}]
+        widget.setup()
+        (body, kwargs) = bodies[-1]
+        assert 'chart_ipynb_spatial' in body
+        self.assertEqual(kwargs, {'cell_size': None})
+        plain = scatter.Scatter()
+        plain.js_init = lambda body, **kwargs: bodies.append((body, kwargs))
+        plain.datasets = [{'label': 'a', 'data': [{'x': 1, 'y': 2}]}]
+        plain.setup()
+        assert 'chart_ipynb_spatial' not in bodies[-1][0]
@@ -23,11 +23,54 @@ class TestTimeSeries(unittest.TestCase):
         self.assertEqual(val, list(case_val))
         self.assertEqual(label, list(date_val))
 
-        mock_global_label = ['2020-01-01','2020-01-02','2020-01-03','2020-01-04']
-        time_series.global_label = mock_global_label
-        val, label = time_series.data_format(df, 'cases', data_provide=True, date_col='Date')
-        self.assertEqual(val, [0, 1, 2, 3])
-        self.assertEqual(label, mock_global_label)
+        indexed = df.assign(Date=pd.to_datetime(df['Date'])).set_index('Date')
+        val, label = time_series.data_format(indexed, 'cases')
+        self.assertEqual(val, list(case_val))
+        self.assertEqual(label, list(date_val))
+
+    def test_align_series(self):
+        longer = ([1, 2, 3, 4], ['2020-01-01','2020-01-02','2020-01-03','2020-01-04'])
+        shorter = ([5, 7], ['2020-01-04','2020-01-02'])
+        labels, (first, second) = time_series.align_series([longer, shorter])
+        self.assertEqual(labels, longer[1])
+        self.assertEqual(first, [1, 2, 3, 4])
+        self.assertEqual(second, [0, 7, 0, 5])
+        gap = ([9], ['2020-01-05'])
+        labels, aligned = time_series.align_series([shorter, gap], missing='null')
+        self.assertEqual(labels, ['2020-01-02', '2020-01-04', '2020-01-05'])
+        self.assertEqual(aligned, [[7, 5, None], [None, None, 9]])
+        labels, aligned = time_series.align_series([shorter, gap], missing='ffill')
+        self.assertEqual(aligned, [[7, 5, 5], [None, None, 9]])
+        self.assertRaises(ValueError, lambda: time_series.align_series([shorter], missing='mean'))
+
+    def test_fetch_datasets(self):
+        import threading
+        import time
+        attempts = {}
+        active = []
+        peak = []
+        lock = threading.Lock()
+        def reader(symbol):
+            with lock:
+                attempts[symbol] = attempts.get(symbol, 0) + 1
+                active.append(symbol)
+                peak.append(len(active))
+            time.sleep(0.02 if symbol != 'A' else 0.05)
+            with lock:
+                active.remove(symbol)
+            if symbol == 'C' and attempts[symbol] < 3:
+                raise IOError('flaky source')
+            return symbol.lower()
+        symbols = ['A', 'B', 'C', 'D', 'E']
+        datasets, timings = time_series.fetch_datasets(symbols, reader, max_workers=3, retry_delay=0.001)
+        self.assertEqual(datasets, ['a', 'b', 'c', 'd', 'e'])
+        self.assertEqual([t['symbol'] for t in timings], symbols)
+        self.assertEqual(timings[2]['attempts'], 3)
+        self.assertEqual(max(peak), 3)
+        assert all(t['seconds'] <= t['total_seconds'] for t in timings)
+        def broken(symbol):
+            raise IOError('offline')
+        self.assertRaises(IOError, lambda: time_series.fetch_datasets(['A', 'B'], broken, retries=1, retry_delay=0.001))
 
     @patch("chart_ipynb.utils.axes")
     def test_default_axis(self, mock_axes):
@@ -26,4 +26,143 @@ class TestUtils(unittest.TestCase):
         self.assertRaises(ValueError, lambda: utils.color_rgb([12]))
         self.assertRaises(KeyError,lambda:utils.color_rgb('test'))
         result = utils.color_rgb('color1')
-        self.assertEqual(result, 'rgb(1, 2, 3, 1.000000)')
\ No newline at end of file
+        self.assertEqual(result, 'rgb(1, 2, 3, 1.000000)')
+
+    def test_typed_array(self):
+        encoded = utils.typed_array([1.5, None, 3], dtype="float32")
+        self.assertEqual(encoded["typed_array"], "Float32Array")
+        self.assertEqual(encoded["length"], 3)
+        self.assertEqual(utils.unpack_data(encoded), [1.5, None, 3.0])
+
+    def test_unpack_item(self):
+        values = [0.1 * i for i in range(20)] + [None]
+        for dtype in ("float64", "float32"):
+            encoded = utils.typed_array(values, dtype=dtype)
+            unpacked = utils.unpack_data(encoded)
+            for index in range(-len(unpacked), len(unpacked)):
+                self.assertEqual(utils.unpack_item(encoded, index), unpacked[index])
+            self.assertRaises(IndexError, lambda: utils.unpack_item(encoded, len(unpacked)))
+        points = utils.typed_columns(x=[None, 2], y=[4, 5])
+        self.assertEqual(utils.unpack_item(points, 1), {'x': 2.0, 'y': 5.0})
+
+    def test_pack_config(self):
+        config = {'type': 'line',
+                  'data': {'labels': ['a', 'b'],
+                           'datasets': [{'label': 'numbers', 'data': [1, 2]},
+                                        {'label': 'names', 'data': ['x', 'y']},
+                                        {'label': 'points', 'data': [{'x': 1, 'y': 2}]}]}}
+        packed = utils.pack_config(config)
+        datasets = packed['data']['datasets']
+        assert utils.is_typed(datasets[0]['data'])
+        self.assertEqual(datasets[1]['data'], ['x', 'y'])
+        assert 'typed_columns' in datasets[2]['data']
+        self.assertEqual(config['data']['datasets'][0]['data'], [1, 2])
+        self.assertEqual(utils.unpack_config(packed), config)
+
+    def test_indexed_list(self):
+        labels = utils.IndexedList(['a', 'b', 'a'])
+        assert 'b' in labels
+        self.assertEqual(labels.index('a'), 0)
+        labels.append('c')
+        self.assertEqual(labels.index('c'), 3)
+        labels.pop(0)
+        self.assertEqual(labels, ['b', 'a', 'c'])
+        self.assertEqual(labels.index('a'), 1)
+        labels.pop()
+        assert 'c' not in labels
+        self.assertRaises(ValueError, lambda: labels.index('c'))
+        labels = utils.IndexedList(['t%s' % i for i in range(5)] + ['t1'])
+        self.assertEqual(labels.index('t3'), 3)
+        self.assertEqual(labels.pop(0), 't0')
+        self.assertEqual(labels.index('t3'), 2)
+        labels.pop(0)
+        self.assertEqual(labels.index('t1'), 3)
+        labels.append('t0')
+        self.assertEqual(labels.index('t0'), 4)
+        assert 't0' in labels
+        labels.pop()
+        labels.pop()
+        assert 't1' not in labels
+        self.assertEqual(labels, ['t2', 't3', 't4'])
+        self.assertEqual([labels.index(v) for v in labels], [0, 1, 2])
+        assert utils.indexed_list(labels) is labels
+        unhashable = utils.IndexedList([[1], [2]])
+        self.assertEqual(unhashable.index([2]), 1)
+
+    def test_ring_buffer(self):
+        ring = utils.RingBuffer(3, values=[1, 2])
+        assert not ring.append(3)
+        assert ring.append(None)
+        self.assertEqual(ring.tolist(), [2.0, 3.0, None])
+        ring.extend([5, 6, 7, 8])
+        self.assertEqual(ring.tolist(), [6.0, 7.0, 8.0])
+        self.assertEqual(ring[-1], 8.0)
+        labels = utils.RingBuffer(2, object, ['a', 'b'], indexed=True)
+        labels.append('c')
+        assert 'a' not in labels
+        self.assertEqual(labels.index('c'), 1)
+        self.assertEqual(labels.pop(0), 'b')
+        self.assertEqual(labels.tolist(), ['c'])
+
+    def test_ring_buffer_setitem_indexed(self):
+        labels = utils.RingBuffer(5, object, ['a', 'b', 'c'], indexed=True)
+        labels[-1] = 'z'
+        self.assertEqual(labels.tolist(), ['a', 'b', 'z'])
+        assert 'c' not in labels
+        self.assertEqual(labels.index('z'), 2)
+        labels[-3] = 'b'
+        self.assertEqual(labels.tolist(), ['b', 'b', 'z'])
+        assert 'a' not in labels
+        self.assertEqual(labels.index('b'), 1)
+        labels[1] = 'y'
+        self.assertEqual(labels.index('b'), 0)
+        labels.extend(['d', 'e', 'f'])
+        labels[-5] = 'x'
+        self.assertEqual(labels.tolist(), ['x', 'z', 'd', 'e', 'f'])
+        self.assertEqual([labels.index(v) for v in labels], [0, 1, 2, 3, 4])
+        assert 'y' not in labels
+
+    def test_point_columns(self):
+        points = utils.PointColumns(x=[1, 2, 3], y=np.array([4.0, 5.0, np.nan]))
+        self.assertEqual(points.tolist(), [{'x': 1.0, 'y': 4.0}, {'x': 2.0, 'y': 5.0}, {'x': 3.0, 'y': None}])
+        points.append({'x': 7, 'y': 8})
+        points.extend([{'x': 9, 'y': 10}, None])
+        self.assertEqual(len(points), 6)
+        self.assertEqual(points[-1], None)
+        self.assertEqual(points.pop(0), {'x': 1.0, 'y': 4.0})
+        self.assertEqual(points.pop(1), {'x': 3.0, 'y': None})
+        points[0] = None
+        self.assertEqual(points, [None, {'x': 7.0, 'y': 8.0}, {'x': 9.0, 'y': 10.0}, None])
+        self.assertEqual(utils.json_safe({'data': points})['data'], points.tolist())
+        packed = utils.pack_data(points)
+        self.assertEqual(utils.unpack_data(packed), [{'x': None, 'y': None}, {'x': 7.0, 'y': 8.0},
+                                                     {'x': 9.0, 'y': 10.0}, {'x': None, 'y': None}])
+        window = points.windowed(2)
+        for i in range(40):
+            window.append({'x': i, 'y': -i})
+        self.assertEqual(window.tolist(), [{'x': 38.0, 'y': -38.0}, {'x': 39.0, 'y': -39.0}])
+        self.assertEqual(len(points), 4)
+        self.assertRaises(TypeError, lambda: utils.PointColumns(x=['a'], y=[1]))
+
+    def test_json_safe(self):
+        import datetime
+        import json
+        import pandas as pd
+        config = {'data': {'labels': pd.Series(pd.to_datetime(['2020-01-01', None])),
+                           'datasets': [{'data': np.array([1.5, np.nan, np.inf]),
+                                         'points': [{'x': np.int64(1), 'y': float('nan')}, {'x': 2, 'y': 3.0}],
+                                         'label': np.str_('a'),
+                                         'hidden': np.bool_(False)}]},
+                  'extra': (np.float32(0.5), datetime.date(2020, 1, 2), pd.Timestamp('2020-01-03 10:00'), pd.NaT),
+                  2: utils.RingBuffer(2, values=[1, 2, 3])}
+        expected = {'data': {'labels': ['2020-01-01', None],
+                             'datasets': [{'data': [1.5, None, None],
+                                           'points': [{'x': 1, 'y': None}, {'x': 2, 'y': 3.0}],
+                                           'label': 'a',
+                                           'hidden': False}]},
+                    'extra': [0.5, '2020-01-02', '2020-01-03T10:00:00', None],
+                    '2': [2.0, 3.0]}
+        self.assertEqual(utils.json_safe(config), expected)
+        self.assertEqual(json.loads(utils.dumps(config)), expected)
+        with patch.dict('sys.modules', {'orjson': None}):
+            self.assertEqual(json.loads(utils.dumps(config)), expected)